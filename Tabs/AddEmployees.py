@@ -1,16 +1,130 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTableWidget,
-    QTableWidgetItem, QHBoxLayout, QMessageBox, QHeaderView, QFileDialog, QShortcut
+    QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QTableView,
+    QHBoxLayout, QMessageBox, QHeaderView, QFileDialog, QShortcut
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QTimer, pyqtSignal
 from PyQt5.QtGui import QKeySequence
 import os
-import csv
+from changes import ChangeTracker, EMPLOYEE, ORDER, SETTLEMENT
+from widgets import ActionDelegate, start_import
+
+SAVE_DELAY_MS = 500  # cell edits made within this window are saved together
+
+
+class EmployeesTableModel(QAbstractTableModel):
+    """Employees as a table model that is updated row by row.
+
+    Cell edits are validated here and queued as pending updates; the tab
+    writes them to the database in batches.
+    """
+
+    HEADERS = ["Employee ID", "Name", "Amount Due", "Delete"]
+    DELETE_COLUMN = 3
+    SORT_ROLE = Qt.UserRole  # raw values, so Amount Due sorts numerically
+
+    edited = pyqtSignal()          # a valid edit was queued
+    invalid_edit = pyqtSignal()    # an edit was rejected
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.employees = []  # [id, emp_id, emp_name, amount_due]
+        self._row_of = {}    # id -> row
+        self.pending = {}    # id -> (id, emp_id, emp_name, amount_due)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.employees)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemIsSelectable | Qt.ItemIsEnabled
+        if index.column() != self.DELETE_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        employee = self.employees[index.row()]
+        column = index.column()
+        if column == self.DELETE_COLUMN:
+            return "🗑️" if role == Qt.DisplayRole else None
+        value = employee[column + 1]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return str(value)
+        if role == self.SORT_ROLE:
+            return value
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() == self.DELETE_COLUMN:
+            return False
+        text = str(value).strip()
+        if index.column() == 2:
+            if not text.replace(".", "", 1).isdigit():
+                self.invalid_edit.emit()
+                return False
+            new_value = float(text)
+        elif not text:
+            self.invalid_edit.emit()
+            return False
+        else:
+            new_value = text
+
+        employee = self.employees[index.row()]
+        if employee[index.column() + 1] == new_value:
+            return True
+        employee[index.column() + 1] = new_value
+        self.pending[employee[0]] = tuple(employee)
+        self.dataChanged.emit(index, index)
+        self.edited.emit()
+        return True
+
+    def id_at(self, row):
+        return self.employees[row][0]
+
+    def set_employees(self, employees):
+        self.beginResetModel()
+        self.employees = [list(row) for row in employees]
+        self._row_of = {row[0]: position for position, row in enumerate(self.employees)}
+        self.endResetModel()
+
+    def add_employee(self, employee):
+        row = len(self.employees)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.employees.append(list(employee))
+        self._row_of[employee[0]] = row
+        self.endInsertRows()
+
+    def remove_employee(self, id):
+        row = self._row_of.pop(id, None)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.employees[row]
+        self.pending.pop(id, None)
+        self.endRemoveRows()
+        for position in range(row, len(self.employees)):
+            self._row_of[self.employees[position][0]] = position
+
+    def take_pending(self):
+        """Return the queued edits and forget them."""
+        pending, self.pending = list(self.pending.values()), {}
+        return pending
+
 
 class AddEmployeesTab(QWidget):
-    def __init__(self, db):
+    def __init__(self, db, worker):
         super().__init__()
         self.db = db
+        self.changes = ChangeTracker(db, EMPLOYEE, ORDER, SETTLEMENT)  # orders and settlements move dues
+        self.worker = worker  # runs queries off the GUI thread
 
         layout = QVBoxLayout()
 
@@ -37,23 +151,52 @@ class AddEmployeesTab(QWidget):
         emp_label.setStyleSheet("font-weight: bold; font-size: 14px;")
         layout.addWidget(emp_label)
 
-        self.emp_table = QTableWidget()
-        self.emp_table.setColumnCount(4)
-        self.emp_table.setHorizontalHeaderLabels(["Employee ID", "Name", "Amount Due", "Delete"])
-        self.emp_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        self.emp_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("🔍 Filter by ID, name or amount due...")
+        layout.addWidget(self.filter_input)
+
+        self.emp_model = EmployeesTableModel(self)
+        self.emp_proxy = QSortFilterProxyModel(self)
+        self.emp_proxy.setSourceModel(self.emp_model)
+        self.emp_proxy.setSortRole(EmployeesTableModel.SORT_ROLE)
+        self.emp_proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.emp_proxy.setFilterKeyColumn(-1)  # match any column
+
+        self.emp_table = QTableView()
+        self.emp_table.setModel(self.emp_proxy)
+        self.emp_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Interactive)
+        self.emp_table.horizontalHeader().resizeSection(0, 160)
         self.emp_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.emp_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Fixed)
+        self.emp_table.horizontalHeader().resizeSection(3, 60)
+        self.emp_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.emp_table.verticalHeader().setDefaultSectionSize(32)
         self.emp_table.setAlternatingRowColors(True)
         self.emp_table.verticalHeader().setVisible(False)
+        self.emp_table.setSortingEnabled(True)
+        self.emp_table.sortByColumn(0, Qt.AscendingOrder)
 
-        self.emp_table.itemChanged.connect(self.handle_item_changed)
+        self.delete_delegate = ActionDelegate(parent=self.emp_table)
+        self.delete_delegate.clicked.connect(
+            lambda index: self.delete_employee(self.emp_model.id_at(self.emp_proxy.mapToSource(index).row()))
+        )
+        self.emp_table.setItemDelegateForColumn(EmployeesTableModel.DELETE_COLUMN, self.delete_delegate)
         layout.addWidget(self.emp_table, stretch=1)
 
         self.setLayout(layout)
 
+        # Edits are queued by the model and saved together after a short pause
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.save_edits)
+
         # Events
         self.add_btn.clicked.connect(self.add_employee)
         self.import_btn.clicked.connect(self.import_employees)
+        self.filter_input.textChanged.connect(self.emp_proxy.setFilterFixedString)
+        self.emp_model.edited.connect(self.save_timer.start)
+        self.emp_model.invalid_edit.connect(lambda: QMessageBox.warning(self, "Error", "Invalid values entered."))
         
         # --- Setup Shortcuts ---
         self.setup_shortcuts()
@@ -64,56 +207,24 @@ class AddEmployeesTab(QWidget):
         self.refresh()  # Initial load
 
     def refresh_employees(self):
-        self.emp_table.blockSignals(True)
-        self.emp_table.setRowCount(0)
-        employees = self.db.get_employees()
-        for row, (id, emp_id, name, due) in enumerate(employees):
-            self.emp_table.insertRow(row)
-
-            # Employee ID (editable)
-            id_item = QTableWidgetItem(emp_id)
-            id_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable)
-            id_item.setData(Qt.UserRole, id)  # internal table id
-            self.emp_table.setItem(row, 0, id_item)
-
-            # Name (editable)
-            name_item = QTableWidgetItem(name)
-            name_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable)
-            name_item.setData(Qt.UserRole, id)
-            self.emp_table.setItem(row, 1, name_item)
-
-            # Amount Due (editable)
-            due_item = QTableWidgetItem(str(due))
-            due_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable)
-            due_item.setData(Qt.UserRole, id)
-            self.emp_table.setItem(row, 2, due_item)
-
-            # Delete button
-            del_btn = QPushButton("🗑️")
-            del_btn.setFixedWidth(40)
-            del_btn.clicked.connect(lambda _, eid=id: self.delete_employee(eid))
-            self.emp_table.setCellWidget(row, 3, del_btn)
-
-        self.emp_table.blockSignals(False)
-        self.emp_table.resizeRowsToContents()
-
-    def handle_item_changed(self, item):
-        row = item.row()
-        col = item.column()
-        if col not in (0, 1, 2):
+        """Reload employees in the background; the table updates when they arrive."""
+        self.save_edits()
+        self.changes.reset()
+        token = self.changes.stale()
+        self.worker.submit("employees", lambda db: db.get_employees(),
+                           lambda employees: (self.emp_model.set_employees(employees), self.changes.mark(token)))
+
+    def save_edits(self):
+        """Write all queued cell edits in one transaction."""
+        self.save_timer.stop()
+        rows = self.emp_model.take_pending()
+        if not rows:
             return
-
-        internal_id = item.data(Qt.UserRole)
-        emp_id_text = self.emp_table.item(row, 0).text()
-        name = self.emp_table.item(row, 1).text()
-        due_text = self.emp_table.item(row, 2).text()
-
-        if not emp_id_text or not name or not due_text.replace(".", "", 1).isdigit():
-            QMessageBox.warning(self, "Error", "Invalid values entered.")
+        with self.changes.local_change():
+            rejected = self.db.update_employees_bulk(rows)
+        if rejected:
+            QMessageBox.warning(self, "Error", "Another employee already has that Employee ID.")
             self.refresh_employees()
-            return
-
-        self.db.update_employee(internal_id, emp_id_text, name, float(due_text))
 
     def add_employee(self):
         emp_id_text = self.emp_id_input.text().strip()
@@ -123,23 +234,31 @@ class AddEmployeesTab(QWidget):
             QMessageBox.warning(self, "Error", "Enter valid Employee ID and Name.")
             return
 
-        success = self.db.add_employee(emp_id_text, name)
-        if not success:
+        with self.changes.local_change():
+            new_id = self.db.add_employee(emp_id_text, name)
+        if not new_id:
             QMessageBox.warning(self, "Error", f"Employee ID {emp_id_text} already exists.")
         else:
+            self.emp_model.add_employee((new_id, emp_id_text, name, 0.0))
             QMessageBox.information(self, "Success", f"Employee {name} added.")
 
         self.emp_id_input.clear()
         self.name_input.clear()
-        self.refresh()
 
     def delete_employee(self, internal_id):
-        self.db.delete_employee(internal_id)
-        self.refresh()
+        with self.changes.local_change():
+            self.db.delete_employee(internal_id)
+        self.emp_model.remove_employee(internal_id)
+
+    def refresh(self, force=False):
+        """General refresh method for tab switching; skipped while the employees are unchanged."""
+        if force or self.changes.stale() is not None:
+            self.refresh_employees()
 
-    def refresh(self):
-        """General refresh method for tab switching"""
-        self.refresh_employees()
+    def hideEvent(self, event):
+        """Save queued edits when the tab is left."""
+        self.save_edits()
+        super().hideEvent(event)
 
     # ---------------- Import Utilities ----------------
     def import_employees(self):
@@ -155,76 +274,30 @@ class AddEmployeesTab(QWidget):
         if not file_path:
             return
 
-        try:
-            if file_path.lower().endswith(".csv"):
-                count = self._import_from_csv(file_path)
-            elif file_path.lower().endswith((".xlsx", ".xls")):
-                count = self._import_from_excel(file_path)
-            else:
-                QMessageBox.warning(self, "Unsupported", "Please select a .csv, .xlsx, or .xls file.")
-                return
-
-            self.refresh()
-            QMessageBox.information(self, "Import Complete", f"Imported {count} employee(s).")
-        except Exception as exc:
-            QMessageBox.critical(self, "Import Failed", f"Error importing file:\n{exc}")
-
-    def _import_from_csv(self, file_path):
-        imported = 0
-        with open(file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            for row_idx, row in enumerate(reader):
-                if not row:
-                    continue
-                cells = [c.strip() for c in row]
-                # header detection
-                if row_idx == 0 and len(cells) >= 2:
-                    header_join = " ".join(cells[:2]).lower()
-                    if ("employee" in header_join or "emp" in header_join) and ("name" in header_join or "id" in header_join):
-                        # If header looks like [emp_id, name] or similar, skip
-                        continue
-
-                if len(cells) < 2:
-                    continue
-                emp_id_text = cells[0]
-                name = cells[1]
-                if not emp_id_text or not name:
-                    continue
-                # Try to add; skip duplicates
-                if self.db.add_employee(emp_id_text, name):
-                    imported += 1
-        return imported
-
-    def _import_from_excel(self, file_path):
-        try:
-            import openpyxl  # type: ignore
-        except Exception:
-            raise RuntimeError("openpyxl is required for Excel import. Please install it.")
-
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-        sheet = wb.active
-        imported = 0
-
-        for row_idx, row in enumerate(sheet.iter_rows(values_only=True)):
-            if not row:
-                continue
-            emp_id_val = row[0] if len(row) > 0 else None
-            name_val = row[1] if len(row) > 1 else None
-
-            # Header detection
-            if row_idx == 0 and isinstance(emp_id_val, str) and isinstance(name_val, (str, type(None))):
-                header = f"{emp_id_val.lower()} {str(name_val).lower() if name_val is not None else ''}"
-                if ("employee" in header or "emp" in header) and ("name" in header or "id" in header):
-                    continue
-
-            emp_id_text = str(emp_id_val).strip() if emp_id_val is not None else ""
-            name = str(name_val).strip() if name_val is not None else ""
-            if not emp_id_text or not name:
-                continue
-            if self.db.add_employee(emp_id_text, name):
-                imported += 1
-
-        return imported
+        if not file_path.lower().endswith((".csv", ".xlsx", ".xls")):
+            QMessageBox.warning(self, "Unsupported", "Please select a .csv, .xlsx, or .xls file.")
+            return
+
+        # Streams the file in a background thread, committing in chunks
+        self.import_btn.setEnabled(False)
+        self.import_worker = start_import(
+            self, self.db, "employees", file_path, self._import_completed, self._import_failed
+        )
+
+    def _import_completed(self, result):
+        self.import_btn.setEnabled(True)
+        self.refresh()
+        title = "Import Cancelled" if result["cancelled"] else "Import Complete"
+        QMessageBox.information(
+            self, title,
+            f"Imported {result.get('inserted', 0)} employee(s).\n"
+            f"Skipped {result.get('duplicates', 0)} duplicate(s) and {result.get('invalid', 0)} invalid row(s)."
+        )
+
+    def _import_failed(self, message):
+        self.import_btn.setEnabled(True)
+        self.refresh()
+        QMessageBox.critical(self, "Import Failed", f"Error importing file:\n{message}")
 
     def setup_shortcuts(self):
         """Setup keyboard shortcuts for Add Employees tab."""
@@ -269,26 +342,26 @@ class AddEmployeesTab(QWidget):
             QPushButton:pressed {
                 background-color: #005a9e;
             }
-            QTableWidget {
+            QTableView {
                 border: 1px solid #ddd;
                 border-radius: 5px;
                 background-color: white;
                 gridline-color: #e0e0e0;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 border-bottom: 1px solid #e0e0e0;
                 color: #333;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #f5f5f5;
                 color: #333;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e3f2fd;
                 color: #000;
             }
-            QTableWidget::item:selected:hover {
+            QTableView::item:selected:hover {
                 background-color: #bbdefb;
                 color: #000;
             }
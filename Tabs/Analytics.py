@@ -1,14 +1,26 @@
+import logging
+
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QGridLayout, QTableWidget, QTableWidgetItem,
     QHeaderView, QPushButton, QHBoxLayout, QDateEdit, QMessageBox
 )
 from PyQt5.QtCore import Qt, QDate
+from changes import ChangeTracker
+
+SECTION_TITLES = {
+    "kpis": "totals",
+    "debtors": "top debtors",
+    "recent": "recent orders",
+    "top_items": "top items",
+}
 
 
 class AnalyticsTab(QWidget):
-    def __init__(self, db):
+    def __init__(self, db, worker):
         super().__init__()
         self.db = db
+        self.worker = worker  # runs queries off the GUI thread
+        self.changes = ChangeTracker(db)  # every kind of change feeds some figure
 
         layout = QVBoxLayout()
 
@@ -35,9 +47,19 @@ class AnalyticsTab(QWidget):
         filter_layout.addWidget(self.clear_filter_btn)
 
         layout.addLayout(filter_layout)
+
+        # Names the sections that failed to load and still show older figures
+        self.error_label = QLabel()
+        self.error_label.setWordWrap(True)
+        self.error_label.setStyleSheet("color: #d32f2f; font-weight: bold;")
+        self.error_label.hide()
+        layout.addWidget(self.error_label)
         
         # Initialize filter state
         self.filter_applied = False
+        self._loading_token = None  # token of the refresh still in flight
+        self._loading = set()       # its sections not yet rendered
+        self._failed = {}           # section name -> error message of its last load
 
         # --- KPI Section ---
         self.kpi_grid = QGridLayout()
@@ -120,14 +142,21 @@ class AnalyticsTab(QWidget):
 
         # Refresh Button
         self.refresh_btn = QPushButton("🔄 Refresh")
-        self.refresh_btn.clicked.connect(self.refresh)
+        self.refresh_btn.clicked.connect(lambda: self.refresh(force=True))
         layout.addWidget(self.refresh_btn)
 
+        self.section_widgets = {
+            "kpis": list(self.kpi_labels.values()),
+            "debtors": [self.top_debtors_table],
+            "recent": [self.recent_orders_table],
+            "top_items": [self.top_items_table],
+        }
+
         self.setLayout(layout)
         self.apply_styling()
         self.refresh()
 
-    def refresh(self):
+    def refresh(self, force=False):
         # Compose date range strings - only if filter is applied
         date_from = None
         date_to = None
@@ -135,23 +164,76 @@ class AnalyticsTab(QWidget):
             date_from = self.from_date.date().toString('yyyy-MM-dd') + ' 00:00:00'
             date_to = self.to_date.date().toString('yyyy-MM-dd') + ' 23:59:59'
 
-        # KPIs
-        kpis = self.db.get_kpis(date_from, date_to)
+        # Skip the queries if neither the data nor the date range changed
+        if force:
+            self.changes.reset()
+        token = self.changes.stale((date_from, date_to))
+        if token is None:
+            return
+        if not force and token == self._loading_token:
+            return  # the same refresh is already on its way
+
+        # One background job per section, cheapest first, each rendered as
+        # soon as it arrives. Resubmitting a key supersedes the older request,
+        # so a new date range cancels whatever is left of the previous one.
+        sections = [
+            ("kpis", lambda db: db.get_kpis(date_from, date_to), self.render_kpis),
+            ("debtors", lambda db: db.get_top_debtors(), self.render_debtors),
+            ("recent", lambda db: db.get_recent_orders(date_from=date_from, date_to=date_to), self.render_recent),
+            ("top_items", lambda db: db.get_top_items(date_from=date_from, date_to=date_to), self.render_top_items),
+        ]
+        self._loading_token = token
+        self._loading = {name for name, _, _ in sections}
+        for name, load, render in sections:
+            self.worker.submit(
+                f"analytics.{name}", load,
+                lambda result, name=name, render=render: self._section_loaded(token, name, render, result),
+                lambda message, name=name: self._section_failed(name, message)
+            )
+
+    def _section_loaded(self, token, name, render, result):
+        render(result)
+        if self._failed.pop(name, None) is not None:
+            self._show_section_state(name, None)
+        self._loading.discard(name)
+        if not self._loading:
+            # Only now does the whole dashboard show the data as of token
+            self._loading_token = None
+            self.changes.mark(token)
+
+    def _section_failed(self, name, message):
+        logging.error(f"Analytics section {name} failed: {message}")
+        self._loading_token = None  # let the next refresh try again
+        self._failed[name] = message
+        self._show_section_state(name, message)
+
+    def _show_section_state(self, name, message):
+        """Grey out a section whose figures are stale, or restore it; update the error line."""
+        for widget in self.section_widgets[name]:
+            widget.setEnabled(message is None)
+            widget.setToolTip(f"Not updated: {message}" if message else "")
+        if self._failed:
+            sections = ", ".join(SECTION_TITLES[failed] for failed in sorted(self._failed))
+            self.error_label.setText(
+                f"⚠️ Could not load {sections}; the greyed-out figures are out of date. Press Refresh to retry."
+            )
+            self.error_label.setToolTip("\n".join(f"{SECTION_TITLES[n]}: {m}" for n, m in sorted(self._failed.items())))
+        self.error_label.setVisible(bool(self._failed))
+
+    def render_kpis(self, kpis):
         self.kpi_labels["total_orders"].setText(str(kpis["total_orders"]))
         self.kpi_labels["total_revenue"].setText(f"{kpis['total_revenue']:.2f}")
         self.kpi_labels["total_employees"].setText(str(kpis["total_employees"]))
         self.kpi_labels["total_due"].setText(f"{kpis['total_due']:.2f}")
 
-        # Top items
-        top_items = self.db.get_top_items(date_from=date_from, date_to=date_to)
+    def render_top_items(self, top_items):
         self.top_items_table.setRowCount(0)
         for row, (name, qty) in enumerate(top_items):
             self.top_items_table.insertRow(row)
             self.top_items_table.setItem(row, 0, QTableWidgetItem(name))
             self.top_items_table.setItem(row, 1, QTableWidgetItem(str(qty)))
 
-        # Top debtors
-        debtors = self.db.get_top_debtors()
+    def render_debtors(self, debtors):
         self.top_debtors_table.setRowCount(0)
         for row, (emp_name, emp_id, due) in enumerate(debtors):
             self.top_debtors_table.insertRow(row)
@@ -159,8 +241,7 @@ class AnalyticsTab(QWidget):
             self.top_debtors_table.setItem(row, 1, QTableWidgetItem(emp_id))
             self.top_debtors_table.setItem(row, 2, QTableWidgetItem(f"{due:.2f}"))
 
-        # Recent orders
-        recent = self.db.get_recent_orders(date_from=date_from, date_to=date_to)
+    def render_recent(self, recent):
         self.recent_orders_table.setRowCount(0)
         for row, (order_id, emp_name, total) in enumerate(recent):
             self.recent_orders_table.insertRow(row)
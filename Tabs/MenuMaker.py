@@ -6,12 +6,14 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QKeySequence
 import os
-import csv
+from changes import ChangeTracker, ITEM, MENU
+from widgets import start_import
 
 class MenuMakerTab(QWidget):
     def __init__(self, db):
         super().__init__()
         self.db = db
+        self.changes = ChangeTracker(db, ITEM, MENU)
 
         layout = QVBoxLayout()
 
@@ -122,7 +124,8 @@ class MenuMakerTab(QWidget):
             self.refresh_menu()
             return
 
-        self.db.update_item(item_id, new_name, float(new_cost_text))
+        with self.changes.local_change():
+            self.db.update_item(item_id, new_name, float(new_cost_text))
         self.refresh_today_menu()
 
     def refresh_today_menu(self):
@@ -158,13 +161,25 @@ class MenuMakerTab(QWidget):
             item = self.today_list.item(i)
             if item.checkState() == Qt.Checked:
                 selected_ids.append(item.data(Qt.UserRole))
-        self.db.set_today_menu(selected_ids)
+        with self.changes.local_change():
+            self.db.set_today_menu(selected_ids)
         QMessageBox.information(self, "Saved", "Today’s Menu updated successfully!")
 
-    def refresh(self):
-        """General refresh method for tab switching"""
-        self.refresh_menu()
+    def refresh(self, force=False):
+        """General refresh method for tab switching.
+
+        Only what changed since the last refresh is rebuilt: a menu-only
+        change leaves the item table alone.
+        """
+        if force:
+            self.changes.reset()
+        token = self.changes.stale()
+        if token is None:
+            return
+        if ITEM in self.changes.changed_kinds():
+            self.refresh_menu()
         self.refresh_today_menu()
+        self.changes.mark(token)
 
     # ---------------- Import Utilities ----------------
     def import_items(self):
@@ -178,96 +193,29 @@ class MenuMakerTab(QWidget):
         if not file_path:
             return
 
-        try:
-            imported_count = 0
-            if file_path.lower().endswith(".csv"):
-                imported_count = self._import_from_csv(file_path)
-            elif file_path.lower().endswith((".xlsx", ".xls")):
-                imported_count = self._import_from_excel(file_path)
-            else:
-                QMessageBox.warning(self, "Unsupported", "Please select a .csv, .xlsx, or .xls file.")
-                return
-
-            self.refresh()
-            QMessageBox.information(self, "Import Complete", f"Imported {imported_count} item(s).")
-        except Exception as exc:
-            QMessageBox.critical(self, "Import Failed", f"Error importing file:\n{exc}")
-
-    def _import_from_csv(self, file_path):
-        """Import items from a CSV file with columns: name, price.
-        The file may contain a header row. Extra columns are ignored.
-        """
-        imported = 0
-        with open(file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            for row_idx, row in enumerate(reader):
-                if not row:
-                    continue
-                # Normalize and attempt to detect header
-                cells = [c.strip() for c in row]
-                if row_idx == 0 and len(cells) >= 2:
-                    header_join = " ".join(cells[:2]).lower()
-                    if "name" in header_join and ("price" in header_join or "cost" in header_join):
-                        continue  # skip header
-
-                if len(cells) < 2:
-                    continue
-                name = cells[0]
-                price_text = cells[1].replace("₹", "").strip()
-                # Validate price
-                if not name:
-                    continue
-                if not price_text.replace(".", "", 1).isdigit():
-                    continue
-                self.db.add_item(name, float(price_text))
-                imported += 1
-        return imported
-
-    def _import_from_excel(self, file_path):
-        """Import items from an Excel file with first two columns: name, price.
-        The sheet may contain a header row. Extra columns are ignored.
-        """
-        try:
-            import openpyxl  # type: ignore
-        except Exception:
-            raise RuntimeError("openpyxl is required for Excel import. Please install it.")
-
-        wb = openpyxl.load_workbook(file_path, data_only=True)
-        sheet = wb.active
-        imported = 0
-
-        for row_idx, row in enumerate(sheet.iter_rows(values_only=True)):
-            if not row:
-                continue
-            name = (row[0] if len(row) > 0 else None)
-            price = (row[1] if len(row) > 1 else None)
-
-            # Header detection
-            if row_idx == 0 and isinstance(name, str) and isinstance(price, (str, type(None))):
-                header_join = f"{str(name).lower()} {str(price).lower() if price is not None else ''}"
-                if "name" in header_join and ("price" in header_join or "cost" in header_join):
-                    continue
-
-            if isinstance(name, str):
-                name = name.strip()
-            if not name:
-                continue
-
-            # Normalize/validate price
-            if isinstance(price, str):
-                price_text = price.replace("₹", "").strip()
-                if not price_text.replace(".", "", 1).isdigit():
-                    continue
-                price_val = float(price_text)
-            elif isinstance(price, (int, float)):
-                price_val = float(price)
-            else:
-                continue
-
-            self.db.add_item(name, price_val)
-            imported += 1
-
-        return imported
+        if not file_path.lower().endswith((".csv", ".xlsx", ".xls")):
+            QMessageBox.warning(self, "Unsupported", "Please select a .csv, .xlsx, or .xls file.")
+            return
+
+        # Streams the file in a background thread, committing in chunks
+        self.import_btn.setEnabled(False)
+        self.import_worker = start_import(
+            self, self.db, "items", file_path, self._import_completed, self._import_failed
+        )
+
+    def _import_completed(self, result):
+        self.import_btn.setEnabled(True)
+        self.refresh()
+        title = "Import Cancelled" if result["cancelled"] else "Import Complete"
+        message = f"Imported {result.get('inserted', 0)} item(s)."
+        if result.get("invalid"):
+            message += f"\nSkipped {result['invalid']} row(s) without a valid name and price."
+        QMessageBox.information(self, title, message)
+
+    def _import_failed(self, message):
+        self.import_btn.setEnabled(True)
+        self.refresh()
+        QMessageBox.critical(self, "Import Failed", f"Error importing file:\n{message}")
 
     def setup_shortcuts(self):
         """Setup keyboard shortcuts for Menu Maker tab."""
@@ -1,31 +1,180 @@
+import logging
+import os
+
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView,
-    QPushButton, QMessageBox, QShortcut
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView, QHeaderView, QMessageBox, QShortcut,
+    QPushButton, QDialog, QDialogButtonBox, QFormLayout, QComboBox, QCheckBox, QDateEdit, QFileDialog
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QDate, pyqtSignal
 from PyQt5.QtGui import QKeySequence
+from changes import ChangeTracker, EMPLOYEE, ITEM, ORDER
+from receipts import ReceiptService
+from widgets import ActionDelegate, start_export
+
+PAGE_SIZE = 200  # orders fetched per scroll step
+
+
+class OrdersTableModel(QAbstractTableModel):
+    """Newest-first orders, fetched a page at a time as the view scrolls.
+
+    Pages are keyset queries run on the background database worker, so
+    opening the tab costs one page no matter how long the order history is.
+    load_error carries the message of a failed page, or "" once a page
+    loads; a failed page is fetched again on the next scroll or reload.
+    """
+
+    load_error = pyqtSignal(str)
+
+    HEADERS = ["Order ID", "Employee", "Total (₹)", "Items Ordered", "Receipt", "Delete"]
+    RECEIPT_COLUMN = 4
+    DELETE_COLUMN = 5
+
+    def __init__(self, worker, parent=None):
+        super().__init__(parent)
+        self.worker = worker
+        self.orders = []  # (order_id, emp_name, total, items_str)
+        self.exhausted = False
+        self.loading = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.orders)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        order_id, emp_name, total, items_str = self.orders[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(order_id)
+            if column == 1:
+                return emp_name
+            if column == 2:
+                return str(total)
+            if column == 3:
+                return items_str.replace("\n", ", ")
+            if column == self.RECEIPT_COLUMN:
+                return "🧾"
+            if column == self.DELETE_COLUMN:
+                return "🗑️"
+        elif role == Qt.ToolTipRole and column == 3:
+            return items_str
+        elif role == Qt.ToolTipRole and column == self.RECEIPT_COLUMN:
+            return "Reprint receipt"
+        elif role == Qt.TextAlignmentRole and column in (self.RECEIPT_COLUMN, self.DELETE_COLUMN):
+            return Qt.AlignCenter
+        return None
+
+    def order_at(self, row):
+        return self.orders[row]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted and not self.loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self.loading:
+            return
+        self.loading = True
+        after_id = self.orders[-1][0] if self.orders else None
+        self.worker.submit(
+            "orders.page",
+            lambda db: db.get_orders_with_items(PAGE_SIZE, after_id, descending=True),
+            self._append_page,
+            self._page_failed
+        )
+
+    def _append_page(self, page):
+        self.loading = False
+        self.exhausted = len(page) < PAGE_SIZE
+        self.load_error.emit("")
+        if page:
+            first = len(self.orders)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self.orders.extend(page)
+            self.endInsertRows()
+
+    def _page_failed(self, message):
+        self.loading = False  # not exhausted: canFetchMore lets the view ask again
+        logging.error(f"Loading orders after row {len(self.orders)} failed: {message}")
+        self.load_error.emit(message)
+
+    def reload(self):
+        """Drop everything loaded so far and fetch the first page again."""
+        self.worker.cancel("orders.page")
+        self.beginResetModel()
+        self.orders = []
+        self.exhausted = False
+        self.loading = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def remove_order(self, order_id):
+        for row, order in enumerate(self.orders):
+            if order[0] == order_id:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.orders[row]
+                self.endRemoveRows()
+                return
+
 
 class OrdersTab(QWidget):
-    def __init__(self, db):
+    def __init__(self, db, worker, spooler=None):
         super().__init__()
         self.db = db
+        self.worker = worker  # runs queries off the GUI thread
+        self.changes = ChangeTracker(db, ORDER, EMPLOYEE, ITEM)  # rows show live employee and item names
+        self.receipts = ReceiptService(db, self, spooler)
 
         layout = QVBoxLayout()
 
+        header_layout = QHBoxLayout()
         header = QLabel("📦 Placed Orders")
         header.setStyleSheet("font-weight: bold; font-size: 16px;")
-        layout.addWidget(header)
+        header_layout.addWidget(header)
+        header_layout.addStretch()
+        self.load_error_label = QLabel()
+        self.load_error_label.setStyleSheet("color: #d32f2f;")
+        self.load_error_label.hide()
+        header_layout.addWidget(self.load_error_label)
+        self.export_btn = QPushButton("📄 Batch Export PDFs")
+        self.export_btn.clicked.connect(self.open_batch_export)
+        header_layout.addWidget(self.export_btn)
+        layout.addLayout(header_layout)
 
-        self.order_table = QTableWidget()
-        self.order_table.setColumnCount(5)
-        self.order_table.setHorizontalHeaderLabels(["Order ID", "Employee", "Total (₹)", "Items Ordered", "Delete"])
+        self.orders_model = OrdersTableModel(worker, self)
+        self.orders_model.load_error.connect(self.show_load_error)
+        self.order_table = QTableView()
+        self.order_table.setModel(self.orders_model)
         self.order_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.order_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
         self.order_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
         self.order_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
-        self.order_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
+        for column in (OrdersTableModel.RECEIPT_COLUMN, OrdersTableModel.DELETE_COLUMN):
+            self.order_table.horizontalHeader().setSectionResizeMode(column, QHeaderView.Fixed)
+            self.order_table.horizontalHeader().resizeSection(column, 60)
+        self.order_table.horizontalHeader().setResizeContentsPrecision(PAGE_SIZE)
+        # Fixed row heights: no per-row measuring as pages arrive
+        self.order_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.order_table.verticalHeader().setDefaultSectionSize(32)
         self.order_table.verticalHeader().setVisible(False)
         self.order_table.setAlternatingRowColors(True)
+        self.order_table.setSelectionBehavior(QTableView.SelectRows)
+        self.order_table.setEditTriggers(QTableView.NoEditTriggers)
+
+        self.delete_delegate = ActionDelegate(parent=self.order_table)
+        self.delete_delegate.clicked.connect(lambda index: self.delete_order(self.orders_model.order_at(index.row())[0]))
+        self.order_table.setItemDelegateForColumn(OrdersTableModel.DELETE_COLUMN, self.delete_delegate)
+        self.receipt_delegate = ActionDelegate("#0078d4", self.order_table)
+        self.receipt_delegate.clicked.connect(lambda index: self.receipts.show(self.orders_model.order_at(index.row())[0]))
+        self.order_table.setItemDelegateForColumn(OrdersTableModel.RECEIPT_COLUMN, self.receipt_delegate)
         layout.addWidget(self.order_table)
 
         self.setLayout(layout)
@@ -39,51 +188,24 @@ class OrdersTab(QWidget):
         self.refresh()
 
     def refresh_orders(self):
-        """Refresh orders and show items ordered for each order."""
-        self.order_table.setRowCount(0)
-        orders = self.db.get_orders()
-        for row, (order_id, emp_name, total) in enumerate(orders):
-            self.order_table.insertRow(row)
-            
-            # Order ID
-            self.order_table.setItem(row, 0, QTableWidgetItem(str(order_id)))
-
-            # Employee
-            self.order_table.setItem(row, 1, QTableWidgetItem(emp_name))
-
-            # Total Cost
-            self.order_table.setItem(row, 2, QTableWidgetItem(str(total)))
-
-            # Items Ordered
-            items = self.db.get_order_items(order_id)
-            items_str = "\n".join([f"{name} x{qty}" for name, qty in items])
-            item_cell = QTableWidgetItem(items_str)
-            item_cell.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
-            self.order_table.setItem(row, 3, item_cell)
-
-            # Delete button
-            delete_btn = QPushButton("🗑️")
-            delete_btn.setFixedWidth(40)
-            delete_btn.clicked.connect(lambda _, oid=order_id: self.delete_order(oid))
-            self.order_table.setCellWidget(row, 4, delete_btn)
-
-        self.order_table.resizeRowsToContents()
+        """Reload orders from the newest one; older pages load on scroll."""
+        self.orders_model.reload()
+
+    def show_load_error(self, message):
+        """Show why the last page failed to load, or clear the message once one loads."""
+        self.load_error_label.setText(f"⚠️ Could not load orders: {message} (scroll or press F5 to retry)")
+        self.load_error_label.setToolTip(message)
+        self.load_error_label.setVisible(bool(message))
 
     def delete_order(self, order_id):
         """Delete an order with confirmation."""
-        # Get order details for confirmation
-        orders = self.db.get_orders()
-        order_details = None
-        for oid, emp_name, total in orders:
-            if oid == order_id:
-                order_details = (oid, emp_name, total)
-                break
+        order_details = next((o for o in self.orders_model.orders if o[0] == order_id), None)
         
         if not order_details:
             QMessageBox.warning(self, "Error", "Order not found.")
             return
         
-        oid, emp_name, total = order_details
+        oid, emp_name, total, _ = order_details
         
         # Show confirmation dialog
         reply = QMessageBox.question(
@@ -98,16 +220,84 @@ class OrdersTab(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            success = self.db.delete_order(order_id)
+            with self.changes.local_change():
+                success = self.db.delete_order(order_id)
             if success:
                 QMessageBox.information(self, "Success", f"Order #{order_id} deleted successfully.")
-                self.refresh_orders()
+                self.orders_model.remove_order(order_id)
             else:
                 QMessageBox.warning(self, "Error", "Failed to delete order.")
 
-    def refresh(self):
-        """General refresh for tab switching."""
+    def open_batch_export(self):
+        """Ask what to export, then render the PDFs in the background."""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Batch Export PDFs")
+        form = QFormLayout(dialog)
+
+        kind_combo = QComboBox()
+        kind_combo.addItem("Order receipts", "receipts")
+        kind_combo.addItem("Employee dues statements", "statements")
+        form.addRow("Export:", kind_combo)
+
+        range_checkbox = QCheckBox("Only orders in a date range")
+        range_checkbox.setChecked(True)
+        form.addRow(range_checkbox)
+        from_date = QDateEdit(QDate.currentDate().addDays(1 - QDate.currentDate().day()))
+        to_date = QDateEdit(QDate.currentDate())
+        for date_edit in (from_date, to_date):
+            date_edit.setCalendarPopup(True)
+            range_checkbox.toggled.connect(date_edit.setEnabled)
+        form.addRow("From:", from_date)
+        form.addRow("To:", to_date)
+
+        merged_checkbox = QCheckBox("Single merged PDF")
+        merged_checkbox.setToolTip("Rendered in one pass; the export cannot be cancelled once started.")
+        form.addRow(merged_checkbox)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        form.addRow(buttons)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+
+        out_dir = QFileDialog.getExistingDirectory(self, "Export PDFs to", os.path.expanduser("~"))
+        if not out_dir:
+            return
+
+        date_from = date_to = None
+        if range_checkbox.isChecked():
+            date_from = from_date.date().toString('yyyy-MM-dd') + ' 00:00:00'
+            date_to = to_date.date().toString('yyyy-MM-dd') + ' 23:59:59'
+
+        self.export_btn.setEnabled(False)
+        self.export_worker = start_export(
+            self, self.db, kind_combo.currentData(), out_dir, date_from, date_to,
+            merged_checkbox.isChecked(), self._export_completed, self._export_failed
+        )
+
+    def _export_completed(self, result):
+        self.export_btn.setEnabled(True)
+        status = "Export cancelled" if result["cancelled"] else "Export complete"
+        QMessageBox.information(
+            self, status,
+            f"Rendered {result['documents']} document(s) into {result['files']} PDF file(s) "
+            f"in {result['seconds']:.1f} s."
+        )
+
+    def _export_failed(self, message):
+        self.export_btn.setEnabled(True)
+        QMessageBox.critical(self, "Export Failed", f"Batch export failed:\n\n{message}")
+
+    def refresh(self, force=False):
+        """Refresh for tab switching; skipped while no order or employee changed."""
+        if force:
+            self.changes.reset()
+        token = self.changes.stale()
+        if token is None:
+            return
         self.refresh_orders()
+        self.changes.mark(token)
 
     def setup_shortcuts(self):
         """Setup keyboard shortcuts for Orders tab."""
@@ -123,42 +313,27 @@ class OrdersTab(QWidget):
                 color: #333;
                 margin: 5px 0px;
             }
-            QTableWidget {
+            QTableView {
                 border: 1px solid #ddd;
                 border-radius: 5px;
                 background-color: white;
                 gridline-color: #e0e0e0;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 border-bottom: 1px solid #e0e0e0;
                 color: #333;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #f5f5f5;
                 color: #333;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e3f2fd;
                 color: #000;
             }
-            QTableWidget::item:selected:hover {
+            QTableView::item:selected:hover {
                 background-color: #bbdefb;
                 color: #000;
             }
-            QPushButton {
-                background-color: #dc3545;
-                color: white;
-                border: none;
-                padding: 5px 10px;
-                border-radius: 3px;
-                font-weight: bold;
-                font-size: 12px;
-            }
-            QPushButton:hover {
-                background-color: #c82333;
-            }
-            QPushButton:pressed {
-                background-color: #bd2130;
-            }
         """)
@@ -1,18 +1,23 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QListWidget, QListWidgetItem,
-    QCheckBox, QTextEdit, QDialog, QDialogButtonBox, QShortcut, QFrame
+    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QListWidget,
+    QCheckBox, QDialog, QShortcut, QFrame
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
-from PyQt5.QtGui import QTextDocument, QKeySequence
-import os
-from datetime import datetime
+from PyQt5.QtGui import QKeySequence
+from changes import ChangeTracker, ITEM, MENU
+from receipts import ReceiptService
+from widgets import EmployeeAutocomplete
+
+SUGGESTION_LIMIT = 50  # most employee matches shown while typing
 
 class PlaceOrderTab(QWidget):
-    def __init__(self, db):
+    def __init__(self, db, spooler=None):
         super().__init__()
         self.db = db
+        self.menu_changes = ChangeTracker(db, ITEM, MENU)
+        self.spooler = spooler  # background receipt printing, if available
+        self.receipts = ReceiptService(db, self, spooler)
 
         main_layout = QVBoxLayout()
 
@@ -106,7 +111,7 @@ class PlaceOrderTab(QWidget):
                 background-color: #bd2130;
             }
         """)
-        clear_cart_btn.clicked.connect(self.refresh)
+        clear_cart_btn.clicked.connect(lambda: self.refresh(force=True))
         cart_header_layout.addWidget(clear_cart_btn)
         
         cart_layout.addLayout(cart_header_layout)
@@ -151,7 +156,31 @@ class PlaceOrderTab(QWidget):
                 border: 2px solid #ccc;
             }
         """)
-        cart_layout.addWidget(self.print_receipt_checkbox)
+        receipt_options_layout = QHBoxLayout()
+        receipt_options_layout.addWidget(self.print_receipt_checkbox)
+
+        # Preview toggle: unchecked, receipts go straight to the print queue
+        self.preview_receipt_checkbox = QCheckBox("Preview")
+        self.preview_receipt_checkbox.setChecked(True)
+        self.preview_receipt_checkbox.setStyleSheet(self.print_receipt_checkbox.styleSheet())
+        self.preview_receipt_checkbox.setVisible(spooler is not None)
+        self.print_receipt_checkbox.toggled.connect(self.preview_receipt_checkbox.setEnabled)
+        receipt_options_layout.addWidget(self.preview_receipt_checkbox)
+        receipt_options_layout.addStretch()
+        cart_layout.addLayout(receipt_options_layout)
+
+        # Print queue status
+        print_status_layout = QHBoxLayout()
+        self.print_status_label = QLabel("")
+        self.print_status_label.setStyleSheet("font-weight: normal; color: #555; font-size: 12px;")
+        print_status_layout.addWidget(self.print_status_label, 1)
+        self.retry_print_btn = QPushButton("Retry Failed")
+        self.retry_print_btn.setVisible(False)
+        print_status_layout.addWidget(self.retry_print_btn)
+        cart_layout.addLayout(print_status_layout)
+        if spooler is not None:
+            spooler.status_changed.connect(self.show_print_status)
+            self.retry_print_btn.clicked.connect(spooler.retry_failed)
 
         # Cart action buttons
         cart_buttons_layout = QHBoxLayout()
@@ -188,7 +217,11 @@ class PlaceOrderTab(QWidget):
         # --- Events ---
         self.add_btn.clicked.connect(self.add_to_cart)
         self.place_btn.clicked.connect(self.place_order)
-        self.emp_search.textChanged.connect(self.update_suggestions)
+        self.autocomplete = EmployeeAutocomplete(
+            self.emp_search, self.suggestions_list,
+            self.db.search_employees, self.format_suggestion,
+            limit=SUGGESTION_LIMIT
+        )
         self.suggestions_list.itemClicked.connect(self.select_employee)
 
         # --- Setup Shortcuts ---
@@ -200,16 +233,10 @@ class PlaceOrderTab(QWidget):
         self.refresh()
 
     # --- Employee Autocomplete ---
-    def update_suggestions(self, text):
-        self.suggestions_list.clear()
-        if not text:
-            return
-        text = text.lower()
-        for id, emp_id, name, _ in self.db.get_employees():
-            if text in emp_id.lower() or text in name.lower():
-                item = QListWidgetItem(f"{emp_id} - {name}")
-                item.setData(Qt.UserRole, (id, emp_id, name))
-                self.suggestions_list.addItem(item)
+    @staticmethod
+    def format_suggestion(employee):
+        id, emp_id, name, _ = employee
+        return f"{emp_id} - {name}", (id, emp_id, name)
 
     def select_employee(self, item):
         self.selected_employee = item.data(Qt.UserRole)
@@ -218,7 +245,17 @@ class PlaceOrderTab(QWidget):
         self.emp_name_input.setText(name)
 
     # --- Refresh Menu ---
-    def refresh(self):
+    def refresh(self, force=False):
+        """Reload today's menu and empty the cart.
+
+        Tab switches keep the cart unless the menu changed; force always resets.
+        """
+        if force:
+            self.menu_changes.reset()
+        token = self.menu_changes.stale()
+        if token is None:
+            return
+
         self.cart_items = {}
         self.cart_table.setRowCount(0)
 
@@ -238,6 +275,7 @@ class PlaceOrderTab(QWidget):
             qty_item.setTextAlignment(Qt.AlignCenter)  # Center align text
             self.menu_list.setItem(row, 2, qty_item)
         self.menu_list.blockSignals(False)
+        self.menu_changes.mark(token)
 
 
     # --- Add to Cart ---
@@ -270,8 +308,9 @@ class PlaceOrderTab(QWidget):
     def refresh_cart(self):
         self.cart_table.blockSignals(True)
         self.cart_table.setRowCount(0)
+        menu_names = {iid: name for iid, name, _ in self.db.get_today_menu()}
         for row, (item_id, qty) in enumerate(self.cart_items.items()):
-            item_name = next(name for iid, name, _ in self.db.get_today_menu() if iid == item_id)
+            item_name = menu_names[item_id]
             self.cart_table.insertRow(row)
             self.cart_table.setItem(row, 0, QTableWidgetItem(item_name))
 
@@ -448,305 +487,38 @@ class PlaceOrderTab(QWidget):
                 return
             
             # Print receipt if enabled
+            fast_path = self.spooler is not None and not self.preview_receipt_checkbox.isChecked()
             if self.print_receipt_checkbox.isChecked():
-                self.print_receipt(order_id, emp_text, emp_name, items_with_qty)
-            
-            QMessageBox.information(self, "Success", f"Order #{order_id} placed successfully!")
+                if fast_path:
+                    self.spooler.enqueue(order_id)
+                else:
+                    self.receipts.show(order_id)
+
+            if fast_path:
+                # No modal dialogs: the cashier can go straight to the next order
+                self.print_status_label.setText(f"✓ Order #{order_id} placed")
+            else:
+                QMessageBox.information(self, "Success", f"Order #{order_id} placed successfully!")
 
             # Reset
             self.emp_search.clear()
             self.emp_name_input.clear()
             self.cart_items = {}
             self.selected_employee = None
-            self.refresh()
+            self.refresh(force=True)
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to place order: {str(e)}")
             import logging
             logging.error(f"Order placement failed: {str(e)}")
 
-    # --- Print Receipt ---
-    def print_receipt(self, order_id, emp_id, emp_name, items_with_qty):
-        """Generate and print a receipt for the order with comprehensive error handling."""
-        try:
-            # Calculate total
-            total = 0
-            item_details = []
-            for item_id, qty in items_with_qty:
-                # Get item details from database
-                items = self.db.get_items()
-                for iid, name, cost in items:
-                    if iid == item_id:
-                        item_total = cost * qty
-                        total += item_total
-                        item_details.append((name, qty, cost, item_total))
-                        break
-
-            # Create receipt content
-            receipt_html = self.generate_receipt_html(order_id, emp_id, emp_name, item_details, total)
-            
-            # Show preview dialog with better error handling
-            self.show_receipt_preview(receipt_html, order_id)
-            
-        except Exception as e:
-            # Log the error for debugging
-            import logging
-            logging.error(f"Receipt generation failed: {str(e)}")
-            
-            # Show user-friendly error message
-            QMessageBox.critical(
-                self, 
-                "Receipt Generation Failed", 
-                f"Unable to generate receipt for Order #{order_id}.\n\n"
-                f"Error: {str(e)}\n\n"
-                f"The order has been placed successfully, but receipt printing failed.\n"
-                f"You can view the order details in the Orders tab."
-            )
-
-    def generate_receipt_html(self, order_id, emp_id, emp_name, item_details, total):
-        """Generate HTML content for the receipt."""
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Courier New', monospace; margin: 20px; }}
-                .header {{ text-align: center; border-bottom: 2px solid #000; padding-bottom: 10px; margin-bottom: 20px; }}
-                .title {{ font-size: 24px; font-weight: bold; margin-bottom: 5px; }}
-                .subtitle {{ font-size: 14px; color: #666; }}
-                .order-info {{ margin-bottom: 20px; }}
-                .items-table {{ width: 100%; border-collapse: collapse; margin-bottom: 20px; }}
-                .items-table th, .items-table td {{ border: 1px solid #000; padding: 8px; text-align: left; }}
-                .items-table th {{ background-color: #f0f0f0; font-weight: bold; }}
-                .total {{ font-size: 18px; font-weight: bold; text-align: right; border-top: 2px solid #000; padding-top: 10px; }}
-                .footer {{ text-align: center; margin-top: 30px; font-size: 12px; color: #666; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <div class="title">CAFETERIA RECEIPT</div>
-                <div class="subtitle">Order Management System</div>
-            </div>
-            
-            <div class="order-info">
-                <p><strong>Order ID:</strong> #{order_id}</p>
-                <p><strong>Employee ID:</strong> {emp_id}</p>
-                <p><strong>Employee Name:</strong> {emp_name}</p>
-                <p><strong>Date & Time:</strong> {current_time}</p>
-            </div>
-            
-            <table class="items-table">
-                <thead>
-                    <tr>
-                        <th>Item</th>
-                        <th>Qty</th>
-                        <th>Price</th>
-                        <th>Total</th>
-                    </tr>
-                </thead>
-                <tbody>
-        """
-        
-        for name, qty, price, item_total in item_details:
-            html += f"""
-                    <tr>
-                        <td>{name}</td>
-                        <td>{qty}</td>
-                        <td>₹{price:.2f}</td>
-                        <td>₹{item_total:.2f}</td>
-                    </tr>
-            """
-        
-        html += f"""
-                </tbody>
-            </table>
-            
-            <div class="total">
-                <p>Total Amount: ₹{total:.2f}</p>
-            </div>
-            
-            <div class="footer">
-                <p>Thank you for your order!</p>
-                <p>Generated by Order Management System</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
-
-    def show_receipt_preview(self, receipt_html, order_id):
-        """Show receipt preview dialog with print option and better error handling."""
-        try:
-            dialog = QDialog(self)
-            dialog.setWindowTitle(f"Receipt Preview - Order #{order_id}")
-            dialog.setModal(True)
-            dialog.resize(600, 700)
-            
-            layout = QVBoxLayout()
-            
-            # Receipt preview
-            preview = QTextEdit()
-            preview.setHtml(receipt_html)
-            preview.setReadOnly(True)
-            layout.addWidget(preview)
-            
-            # Buttons
-            button_box = QDialogButtonBox()
-            print_btn = button_box.addButton("🖨️ Print", QDialogButtonBox.ActionRole)
-            save_btn = button_box.addButton("💾 Save as PDF", QDialogButtonBox.ActionRole)
-            copy_btn = button_box.addButton("📋 Copy Text", QDialogButtonBox.ActionRole)
-            close_btn = button_box.addButton("Close", QDialogButtonBox.RejectRole)
-            
-            print_btn.clicked.connect(lambda: self.print_html(receipt_html, order_id))
-            save_btn.clicked.connect(lambda: self.save_receipt_pdf(receipt_html, order_id))
-            copy_btn.clicked.connect(lambda: self.copy_receipt_text(receipt_html, order_id))
-            close_btn.clicked.connect(dialog.accept)
-            
-            layout.addWidget(button_box)
-            dialog.setLayout(layout)
-            dialog.exec_()
-            
-        except Exception as e:
-            import logging
-            logging.error(f"Receipt preview failed: {str(e)}")
-            QMessageBox.critical(
-                self, 
-                "Receipt Preview Error", 
-                f"Unable to show receipt preview.\n\nError: {str(e)}"
-            )
-
-    def print_html(self, html_content, order_id):
-        """Print the HTML content with comprehensive error handling."""
-        try:
-            # Check if printing is available
-            if not QPrinter.availablePrinters():
-                QMessageBox.warning(
-                    self, 
-                    "No Printer Available", 
-                    "No printers are available on this system.\n\n"
-                    "Please connect a printer or use 'Save as PDF' option instead."
-                )
-                return
-
-            printer = QPrinter()
-            printer.setPageSize(QPrinter.A4)
-            printer.setOrientation(QPrinter.Portrait)
-            
-            print_dialog = QPrintDialog(printer, self)
-            print_dialog.setWindowTitle(f"Print Receipt - Order #{order_id}")
-            
-            if print_dialog.exec_() == QPrintDialog.Accepted:
-                doc = QTextDocument()
-                doc.setHtml(html_content)
-                doc.print_(printer)
-                
-                QMessageBox.information(
-                    self, 
-                    "Print Successful", 
-                    f"Receipt for Order #{order_id} has been sent to printer successfully!"
-                )
-            else:
-                # User cancelled printing
-                pass
-                
-        except Exception as e:
-            import logging
-            logging.error(f"Print failed for order {order_id}: {str(e)}")
-            
-            QMessageBox.critical(
-                self, 
-                "Print Failed", 
-                f"Failed to print receipt for Order #{order_id}.\n\n"
-                f"Error: {str(e)}\n\n"
-                f"Possible solutions:\n"
-                f"• Check if printer is connected and turned on\n"
-                f"• Try using 'Save as PDF' option instead\n"
-                f"• Restart the application and try again"
-            )
-
-    def save_receipt_pdf(self, html_content, order_id):
-        """Save receipt as PDF file with error handling."""
-        try:
-            from PyQt5.QtWidgets import QFileDialog
-            from PyQt5.QtPrintSupport import QPrinter
-            from PyQt5.QtCore import QFileInfo
-            
-            # Get save location
-            filename = f"Receipt_Order_{order_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Save Receipt as PDF",
-                filename,
-                "PDF Files (*.pdf);;All Files (*)"
-            )
-            
-            if file_path:
-                # Create PDF printer
-                printer = QPrinter(QPrinter.HighResolution)
-                printer.setOutputFormat(QPrinter.PdfFormat)
-                printer.setOutputFileName(file_path)
-                printer.setPageSize(QPrinter.A4)
-                printer.setOrientation(QPrinter.Portrait)
-                
-                # Generate PDF
-                doc = QTextDocument()
-                doc.setHtml(html_content)
-                doc.print_(printer)
-                
-                QMessageBox.information(
-                    self, 
-                    "PDF Saved Successfully", 
-                    f"Receipt for Order #{order_id} has been saved as PDF:\n\n{file_path}"
-                )
-            else:
-                # User cancelled save
-                pass
-                
-        except Exception as e:
-            import logging
-            logging.error(f"PDF save failed for order {order_id}: {str(e)}")
-            
-            QMessageBox.critical(
-                self, 
-                "PDF Save Failed", 
-                f"Failed to save receipt as PDF for Order #{order_id}.\n\n"
-                f"Error: {str(e)}\n\n"
-                f"Please check if you have write permissions to the selected location."
-            )
-
-    def copy_receipt_text(self, html_content, order_id):
-        """Copy receipt as plain text to clipboard as fallback option."""
-        try:
-            from PyQt5.QtWidgets import QApplication
-            from PyQt5.QtCore import QMimeData
-            
-            # Convert HTML to plain text
-            doc = QTextDocument()
-            doc.setHtml(html_content)
-            plain_text = doc.toPlainText()
-            
-            # Copy to clipboard
-            clipboard = QApplication.clipboard()
-            clipboard.setText(plain_text)
-            
-            QMessageBox.information(
-                self, 
-                "Text Copied", 
-                f"Receipt text for Order #{order_id} has been copied to clipboard.\n\n"
-                f"You can now paste it into any text editor or document."
-            )
-            
-        except Exception as e:
-            import logging
-            logging.error(f"Copy to clipboard failed for order {order_id}: {str(e)}")
-            
-            QMessageBox.warning(
-                self, 
-                "Copy Failed", 
-                f"Failed to copy receipt text to clipboard.\n\nError: {str(e)}"
-            )
+    def show_print_status(self, queued, failed, message):
+        """Show the print queue state reported by the spooler."""
+        status = f"🖨️ {queued} queued" if queued else "🖨️ Idle"
+        if failed:
+            status += f" · ⚠️ {failed} failed"
+        self.print_status_label.setText(f"{status} — {message}")
+        self.retry_print_btn.setVisible(failed > 0)
 
     def setup_shortcuts(self):
         """Setup keyboard shortcuts for Place Order tab."""
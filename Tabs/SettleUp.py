@@ -1,9 +1,12 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, QHBoxLayout,
-    QMessageBox, QListWidget, QListWidgetItem, QShortcut
+    QMessageBox, QListWidget, QShortcut
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QKeySequence
+from widgets import EmployeeAutocomplete
+
+SUGGESTION_LIMIT = 50  # most employee matches shown while typing
 
 class SettleUpTab(QWidget):
     def __init__(self, db):
@@ -40,7 +43,13 @@ class SettleUpTab(QWidget):
         self.setLayout(layout)
 
         # --- Events ---
-        self.search_input.textChanged.connect(self.update_suggestions)
+        # Matching employees, largest dues first
+        self.autocomplete = EmployeeAutocomplete(
+            self.search_input, self.suggestions_list,
+            lambda text, limit: self.db.search_employees(text, limit, order_by="amount_due"),
+            self.format_suggestion,
+            limit=SUGGESTION_LIMIT
+        )
         self.suggestions_list.itemClicked.connect(self.select_employee)
         self.settle_btn.clicked.connect(self.settle_up)
 
@@ -52,29 +61,12 @@ class SettleUpTab(QWidget):
 
         self.selected_employee = None  # store selected employee
 
-    def update_suggestions(self, text):
-        self.suggestions_list.clear()
-        if not text:
-            return
-        text = text.lower()
-        employees = self.db.get_employees()
-        
-        # Filter and sort employees by decreasing due amounts
-        filtered_employees = []
-        for id, emp_id, name, due in employees:
-            if text in emp_id.lower() or text in name.lower():
-                filtered_employees.append((id, emp_id, name, due))
-        
-        # Sort by due amount in decreasing order
-        filtered_employees.sort(key=lambda x: x[3], reverse=True)
-        
-        for id, emp_id, name, due in filtered_employees:
-            if due < 0:
-                item = QListWidgetItem(f"{emp_id} - {name} (Credit: ₹{abs(due):.2f})")
-            else:
-                item = QListWidgetItem(f"{emp_id} - {name} (Due: ₹{due:.2f})")
-            item.setData(Qt.UserRole, (id, emp_id, name, due))
-            self.suggestions_list.addItem(item)
+    @staticmethod
+    def format_suggestion(employee):
+        id, emp_id, name, due = employee
+        if due < 0:
+            return f"{emp_id} - {name} (Credit: ₹{abs(due):.2f})", employee
+        return f"{emp_id} - {name} (Due: ₹{due:.2f})", employee
 
     def select_employee(self, item):
         self.selected_employee = item.data(Qt.UserRole)
@@ -146,12 +138,12 @@ class SettleUpTab(QWidget):
 
         # Refresh selection
         self.selected_employee = (internal_id, emp_id, name, new_due)
-        self.update_suggestions(self.search_input.text())
+        self.autocomplete.refresh()
 
-    def refresh(self):
-        """Refresh the tab content when switching."""
+    def refresh(self, force=False):
+        """Reset the form when switching; it shows no cached data, so force changes nothing."""
         self.search_input.clear()
-        self.suggestions_list.clear()
+        self.autocomplete.clear()
         self.amount_label.setText("0")
         self.settle_input.clear()
         self.selected_employee = None
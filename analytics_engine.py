@@ -0,0 +1,213 @@
+"""
+Optional columnar analytics engine backed by NumPy.
+
+Orders and order lines are loaded once into NumPy arrays sorted by
+timestamp. Later calls append only orders newer than the last one loaded
+(the watermark). Range queries are then a searchsorted slice followed by a
+vectorized sum or bincount, with no SQL GROUP BY.
+
+Enable it with OMS_ANALYTICS_ENGINE=numpy. Database keeps calling it through
+the usual get_kpis / get_top_items / get_employee_spend / get_hourly_revenue
+methods. Without NumPy, or with the variable unset, everything stays in SQL.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    np = None
+
+log = logging.getLogger("oms.analytics")
+
+ENGINE_ENV = "OMS_ANALYTICS_ENGINE"
+LOAD_CHUNK_SIZE = 100000  # rows fetched per fetchmany() while loading
+NO_TIMESTAMP = -(2 ** 62)  # sorts before every real timestamp; only all-time queries see it
+
+
+def create_engine():
+    """Return a ColumnarEngine if OMS_ANALYTICS_ENGINE asks for one, else None."""
+    choice = os.environ.get(ENGINE_ENV, "sql").strip().lower()
+    if choice != "numpy":
+        return None
+    if np is None:
+        log.warning(f"{ENGINE_ENV}=numpy but NumPy is not installed; using SQL analytics")
+        return None
+    return ColumnarEngine()
+
+
+def _fetch_columns(cursor, sql, params, dtypes):
+    """Run sql and return its result as one NumPy array per column."""
+    cursor.execute(sql, params)
+    chunks = [[np.empty(0, dtype=dtype)] for dtype in dtypes]
+    while True:
+        rows = cursor.fetchmany(LOAD_CHUNK_SIZE)
+        if not rows:
+            break
+        for column, values, dtype in zip(chunks, zip(*rows), dtypes):
+            column.append(np.array(values, dtype=dtype))
+    return [np.concatenate(column) for column in chunks]
+
+
+class ColumnarEngine:
+    """In-memory columns for orders and order lines, kept in timestamp order.
+
+    One engine is shared by a Database and its clones; calls are serialized
+    with a lock and use the connection of whichever Database makes them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.watermark = 0  # highest order_id loaded
+        self.emp_codes = []  # emp index -> orders.emp_id
+        self._emp_index = {}
+        self.order_ts = np.empty(0, dtype=np.int64)
+        self.order_emp = np.empty(0, dtype=np.int64)
+        self.order_amount = np.empty(0, dtype=np.float64)
+        self.line_ts = np.empty(0, dtype=np.int64)
+        self.line_item = np.empty(0, dtype=np.int64)
+        self.line_qty = np.empty(0, dtype=np.int64)
+        self.line_amount = np.empty(0, dtype=np.float64)
+
+    # ---------------- Loading ----------------
+    def sync(self, conn):
+        """Append orders newer than the watermark; reload everything if any were deleted."""
+        cursor = conn.cursor()
+        loaded = cursor.execute(
+            "SELECT COUNT(*) FROM orders WHERE order_id <= ?", (self.watermark,)
+        ).fetchone()[0]
+        if loaded != len(self.order_ts):
+            log.info("Analytics engine: orders were deleted, reloading")
+            self._clear()
+
+        order_ids, order_ts, emp_codes, order_amount = _fetch_columns(
+            cursor,
+            """
+            SELECT order_id, COALESCE(created_ts, ?), emp_id, COALESCE(total_order_cost, 0)
+            FROM orders
+            WHERE order_id > ?
+            ORDER BY order_id
+            """,
+            (NO_TIMESTAMP, self.watermark),
+            (np.int64, np.int64, object, np.float64)
+        )
+        if not len(order_ids):
+            return
+
+        line_ts, line_item, line_qty, line_amount = _fetch_columns(
+            cursor,
+            """
+            SELECT COALESCE(o.created_ts, ?), oi.item_id, oi.quantity,
+                   oi.quantity * COALESCE(oi.unit_price, 0)
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.order_id
+            WHERE o.order_id > ?
+            """,
+            (NO_TIMESTAMP, self.watermark),
+            (np.int64, np.int64, np.int64, np.float64)
+        )
+
+        order_emp = np.fromiter(
+            (self._emp_index.setdefault(code, len(self._emp_index)) for code in emp_codes),
+            dtype=np.int64, count=len(emp_codes)
+        )
+        self.emp_codes = list(self._emp_index)
+
+        self.order_ts, (self.order_emp, self.order_amount) = self._append(
+            self.order_ts, order_ts, [(self.order_emp, order_emp), (self.order_amount, order_amount)]
+        )
+        self.line_ts, (self.line_item, self.line_qty, self.line_amount) = self._append(
+            self.line_ts, line_ts,
+            [(self.line_item, line_item), (self.line_qty, line_qty), (self.line_amount, line_amount)]
+        )
+        self.watermark = int(order_ids[-1])
+        log.info(f"Analytics engine: loaded {len(order_ids)} orders, {len(line_ts)} lines")
+
+    @staticmethod
+    def _append(ts, new_ts, columns):
+        """Concatenate new rows, re-sorting by timestamp only if they arrive out of order."""
+        ts = np.concatenate([ts, new_ts])
+        merged = [np.concatenate([old, new]) for old, new in columns]
+        if len(ts) > 1 and np.any(ts[1:] < ts[:-1]):
+            order = np.argsort(ts, kind="stable")
+            ts = ts[order]
+            merged = [column[order] for column in merged]
+        return ts, merged
+
+    # ---------------- Queries ----------------
+    @staticmethod
+    def _window(ts, ts_from, ts_to):
+        """Slice of the timestamp-sorted column ts inside [ts_from, ts_to] (all rows if None)."""
+        if ts_from is None or ts_to is None:
+            return slice(0, len(ts))
+        lo = np.searchsorted(ts, ts_from, side="left")
+        hi = np.searchsorted(ts, ts_to, side="right")
+        return slice(lo, max(lo, hi))
+
+    def order_totals(self, conn, ts_from=None, ts_to=None):
+        """Return (order_count, revenue) for orders in the range."""
+        with self._lock:
+            self.sync(conn)
+            window = self._window(self.order_ts, ts_from, ts_to)
+            return window.stop - window.start, float(self.order_amount[window].sum())
+
+    def item_quantities(self, conn, ts_from=None, ts_to=None):
+        """Return [(item_id, quantity)] sold in the range, largest first."""
+        with self._lock:
+            self.sync(conn)
+            window = self._window(self.line_ts, ts_from, ts_to)
+            items, qty = self.line_item[window], self.line_qty[window]
+        if not len(items):
+            return []
+        totals = np.bincount(items, weights=qty)
+        sold = np.flatnonzero(totals)
+        ranked = sold[np.argsort(-totals[sold], kind="stable")]
+        return [(int(item_id), int(totals[item_id])) for item_id in ranked]
+
+    def employee_spend(self, conn, ts_from=None, ts_to=None):
+        """Return [(emp_id, total)] spent in the range, largest first."""
+        with self._lock:
+            self.sync(conn)
+            window = self._window(self.order_ts, ts_from, ts_to)
+            emps, amounts = self.order_emp[window], self.order_amount[window]
+            codes = self.emp_codes
+        if not len(emps):
+            return []
+        totals = np.bincount(emps, weights=amounts)
+        spent = np.flatnonzero(np.bincount(emps))
+        ranked = spent[np.argsort(-totals[spent], kind="stable")]
+        return [(codes[index], float(totals[index])) for index in ranked]
+
+    def hourly_revenue(self, conn, ts_from=None, ts_to=None):
+        """Return [(hour, order_count, revenue)] per local hour, or None if the
+        range spans a UTC offset change (the caller then falls back to SQL)."""
+        with self._lock:
+            self.sync(conn)
+            window = self._window(self.order_ts, ts_from, ts_to)
+            ts, amounts = self.order_ts[window], self.order_amount[window]
+        dated = ts != NO_TIMESTAMP
+        ts, amounts = ts[dated], amounts[dated]
+        if not len(ts):
+            return []
+
+        offsets = {datetime.fromtimestamp(int(t)).astimezone().utcoffset() for t in (ts[0], ts[-1])}
+        if len(offsets) > 1:
+            return None
+        offset = int(offsets.pop().total_seconds())
+
+        hours = (ts + offset) // 3600
+        first = hours[0]
+        counts = np.bincount(hours - first)
+        revenue = np.bincount(hours - first, weights=amounts)
+        rows = []
+        for bucket in np.flatnonzero(counts):
+            start = int((first + bucket) * 3600 - offset)
+            label = datetime.fromtimestamp(start).strftime("%Y-%m-%d %H:00")
+            rows.append((label, int(counts[bucket]), float(revenue[bucket])))
+        return rows
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Batch PDF export of order receipts and employee dues statements.
+
+The parent process streams receipts or statements from the database and hands
+them out in batches to a process pool. Each worker process runs its own
+offscreen QGuiApplication and renders PDFs with its own QPrinter, so rendering
+uses every core and never touches the GUI thread. Progress is reported as
+batches finish.
+
+Output is one PDF per order or employee, or with merged=True a single PDF
+with one page per document. There is no PDF library to stitch worker output
+together, so a merged file is rendered by one worker in a single pass, which
+cannot be cancelled or report progress part way through.
+
+Usage:
+    python3 batch_export.py receipts --out DIR [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--merged] [--workers N] [--db orders.db]
+    python3 batch_export.py statements --out DIR [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--merged] [--workers N] [--db orders.db]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QGuiApplication, QTextDocument
+from PyQt5.QtPrintSupport import QPrinter
+
+from db import Database
+from log_config import configure_logging
+from receipts import receipt_body, render_pages_html, statement_body
+
+log = logging.getLogger("oms.export")
+
+BATCH_SIZE = 20  # documents per worker task
+
+EXPORT_KINDS = {
+    # kind: (Database iterator, KPI that counts the documents, file name prefix)
+    "receipts": ("iter_order_receipts", "total_orders", "Receipt_Order"),
+    "statements": ("iter_employee_statements", "total_employees", "Statement"),
+}
+
+_app = None  # the worker process's QGuiApplication
+
+
+def _init_worker():
+    """Give each worker process an offscreen QGuiApplication for text layout."""
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    _app = QGuiApplication.instance() or QGuiApplication([])
+
+
+def _document_key(kind, doc):
+    return doc["order_id"] if kind == "receipts" else doc["emp_id"]
+
+
+def _file_name(kind, doc):
+    key = re.sub(r"[^\w.-]", "_", str(_document_key(kind, doc)))
+    return f"{EXPORT_KINDS[kind][2]}_{key}.pdf"
+
+
+def _page_body(kind, doc, period):
+    return receipt_body(doc) if kind == "receipts" else statement_body(doc, period)
+
+
+def _write_pdf(html_text, path):
+    printer = QPrinter(QPrinter.HighResolution)
+    printer.setOutputFormat(QPrinter.PdfFormat)
+    printer.setOutputFileName(path)
+    printer.setPageSize(QPrinter.A4)
+    printer.setOrientation(QPrinter.Portrait)
+    doc = QTextDocument()
+    doc.setHtml(html_text)
+    doc.print_(printer)
+
+
+def _render_batch(kind, docs, out_dir, period, merged_name=None):
+    """Worker task: render docs to PDFs in out_dir and return how many were rendered."""
+    if merged_name:
+        pages = (_page_body(kind, doc, period) for doc in docs)
+        _write_pdf(render_pages_html(pages), os.path.join(out_dir, merged_name))
+    else:
+        for doc in docs:
+            _write_pdf(render_pages_html([_page_body(kind, doc, period)]), os.path.join(out_dir, _file_name(kind, doc)))
+    return len(docs)
+
+
+def _batches(docs, size):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_pdfs(db, kind, out_dir, date_from=None, date_to=None, merged=False, workers=None,
+                progress=None, is_cancelled=None):
+    """Render every receipt or statement in the date range to PDFs in out_dir.
+
+    progress(done, total) is called as documents finish; is_cancelled() is
+    polled between batches. A merged export renders in one task, so it can
+    only be cancelled before that task starts and reports progress once, at
+    the end. Returns a dict with documents, files, cancelled and seconds.
+    Files written before a cancellation are kept.
+    """
+    iterator, count_kpi, prefix = EXPORT_KINDS[kind]
+    os.makedirs(out_dir, exist_ok=True)
+    period = f"{date_from[:10]} to {date_to[:10]}" if date_from and date_to else "All time"
+    total = db.get_kpis(date_from, date_to)[count_kpi]
+    docs = getattr(db, iterator)(date_from, date_to)
+    workers = workers or os.cpu_count() or 1
+    progress = progress or (lambda done, total: None)
+    is_cancelled = is_cancelled or (lambda: False)
+
+    start = time.perf_counter()
+    result = {"documents": 0, "files": 0, "cancelled": False}
+    # spawn, not fork: the parent may be a running Qt application
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+        if merged:
+            # The worker needs every document at once. Cancelling works while
+            # they are gathered, but not once the single render has started.
+            gathered = []
+            for batch in _batches(docs, BATCH_SIZE):
+                if is_cancelled():
+                    break
+                gathered.extend(batch)
+            if is_cancelled():
+                result["cancelled"] = True
+            else:
+                merged_name = f"{prefix}s_{period.replace(' ', '_')}.pdf"
+                result["documents"] = pool.submit(_render_batch, kind, gathered, out_dir, period, merged_name).result()
+                result["files"] = 1
+                progress(result["documents"], total)
+        else:
+            pending = set()
+            for batch in _batches(docs, BATCH_SIZE):
+                if is_cancelled():
+                    result["cancelled"] = True
+                    break
+                pending.add(pool.submit(_render_batch, kind, batch, out_dir, period))
+                if len(pending) >= workers * 2:  # keep memory flat on long ranges
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result["documents"] += future.result()
+                    progress(result["documents"], total)
+            for future in pending:
+                if result["cancelled"] and future.cancel():
+                    continue
+                result["documents"] += future.result()
+                progress(result["documents"], total)
+            result["files"] = result["documents"]
+
+    result["seconds"] = time.perf_counter() - start
+    log.info(f"Exported {result['documents']} {kind} to {out_dir} in {result['seconds']:.1f}s")
+    return result
+
+
+class ExportWorker(QThread):
+    """Runs export_pdfs in the background with its own database connection.
+
+    progress carries the percentage of documents rendered; completed carries
+    the export_pdfs result. requestInterruption() stops handing out batches.
+    """
+
+    progress = pyqtSignal(int)
+    completed = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db, kind, out_dir, date_from=None, date_to=None, merged=False, parent=None):
+        super().__init__(parent)
+        self.source_db = db
+        self.options = (kind, out_dir, date_from, date_to, merged)
+
+    def run(self):
+        db = self.source_db.clone()  # connections are bound to their thread
+        try:
+            kind, out_dir, date_from, date_to, merged = self.options
+            self.completed.emit(export_pdfs(
+                db, kind, out_dir, date_from, date_to, merged,
+                progress=lambda done, total: self.progress.emit(int(done * 100 / total) if total else 100),
+                is_cancelled=self.isInterruptionRequested
+            ))
+        except Exception as exc:
+            log.exception("Batch export failed")
+            self.failed.emit(str(exc))
+        finally:
+            db.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export receipts or dues statements as PDFs")
+    parser.add_argument("kind", choices=sorted(EXPORT_KINDS), help="what to export")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--from", dest="date_from", help="first day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", help="last day, YYYY-MM-DD")
+    parser.add_argument("--merged", action="store_true", help="write a single PDF instead of one per document")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--db", default="orders.db", help="database file name in the data directory")
+    args = parser.parse_args()
+    if bool(args.date_from) != bool(args.date_to):
+        parser.error("--from and --to must be given together")
+    configure_logging()
+
+    print("=" * 60)
+    print("ORDER MANAGEMENT SYSTEM - BATCH PDF EXPORT")
+    print("=" * 60)
+
+    date_from = f"{args.date_from} 00:00:00" if args.date_from else None
+    date_to = f"{args.date_to} 23:59:59" if args.date_to else None
+    db = Database(args.db)
+    try:
+        result = export_pdfs(
+            db, args.kind, args.out, date_from, date_to, args.merged, args.workers,
+            progress=lambda done, total: print(f"\r  {done}/{total} {args.kind} rendered", end="", flush=True)
+        )
+    finally:
+        db.conn.close()
+    print(f"\n✓ Wrote {result['files']} file(s) for {result['documents']} {args.kind} "
+          f"in {result['seconds']:.1f} s to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
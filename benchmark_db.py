@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the Order Management System database layer.
+Runs against a throwaway database in the data directory and removes it afterwards.
+
+Usage:
+    python3 benchmark_db.py [--orders N] [--lines N] [--analytics-lines N]
+"""
+
+import argparse
+import glob
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from changes import ORDER
+from db import Database
+from log_config import configure_logging
+from analytics_engine import ColumnarEngine, np
+
+BENCHMARK_DB = "benchmark.db"
+
+def legacy_place_order(db, emp_id, items_with_qty):
+    """The original place_order shape: one price lookup and one INSERT per cart line.
+
+    Writes the same rows as Database.place_order (unit prices, created_ts and
+    the daily sales rollups) so the two paths are compared like for like.
+    """
+    cursor = db.conn.cursor()
+
+    total = 0
+    prices = []
+    for item_id, qty in items_with_qty:
+        cursor.execute("SELECT cost FROM items WHERE item_id=?", (item_id,))
+        price = cursor.fetchone()[0]
+        prices.append(price)
+        total += price * qty
+
+    now = datetime.now().replace(microsecond=0)
+    now_iso = now.strftime('%Y-%m-%d %H:%M:%S')
+    cursor.execute(
+        "INSERT INTO orders(emp_id, total_order_cost, created_at, created_ts) VALUES(?, ?, ?, ?)",
+        (emp_id, total, now_iso, int(now.timestamp()))
+    )
+    order_id = cursor.lastrowid
+
+    for (item_id, qty), price in zip(items_with_qty, prices):
+        cursor.execute(
+            "INSERT INTO order_items(order_id, item_id, quantity, unit_price) VALUES(?, ?, ?, ?)",
+            (order_id, item_id, qty, price)
+        )
+
+    cursor.execute("UPDATE employees SET amount_due = amount_due + ? WHERE emp_id=?", (total, emp_id))
+    db._add_to_rollups(
+        cursor, now_iso[:10], 1, total,
+        [(item_id, qty, qty * price) for (item_id, qty), price in zip(items_with_qty, prices)]
+    )
+
+    db.conn.commit()
+    db.publish(ORDER)
+    return order_id
+
+def time_orders(place, db, carts, emp_ids):
+    """Place every cart and return per-order latencies in milliseconds."""
+    latencies = []
+    for i, cart in enumerate(carts):
+        start = time.perf_counter()
+        place(db, emp_ids[i % len(emp_ids)], cart)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def summarize(label, latencies):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    mean = sum(latencies) / len(latencies)
+    print(f"  {label:<10} mean {mean:7.3f} ms   p50 {p50:7.3f} ms   p95 {p95:7.3f} ms")
+    return mean
+
+def benchmark_place_order(db, orders, lines):
+    """Compare the per-line and batched order write paths."""
+    print(f"\n🛒 PLACE ORDER ({orders} orders x {lines} lines)")
+    print("-" * 40)
+
+    for i in range(200):
+        db.add_employee(f"BENCH{i:04d}", f"Bench Employee {i}")
+    for i in range(max(lines, 50)):
+        db.add_item(f"Bench Item {i}", 10 + i)
+    emp_ids = [row[1] for row in db.get_employees()]
+    item_ids = [row[0] for row in db.get_items()]
+    carts = [
+        [(item_ids[(o + l) % len(item_ids)], 1 + l % 3) for l in range(lines)]
+        for o in range(orders)
+    ]
+
+    per_line = summarize("per-line", time_orders(legacy_place_order, db, carts, emp_ids))
+    batched = summarize("batched", time_orders(Database.place_order, db, carts, emp_ids))
+    print(f"✓ Mean latency, batched / per-line: {batched / per_line:.2f} "
+          f"({'faster' if batched < per_line else 'slower'} by {abs(per_line - batched):.3f} ms per order)")
+
+def generate_history(db, lines, lines_per_order=5, days=365):
+    """Bulk-insert about `lines` order lines spread over the last `days` days."""
+    employees = [row[1] for row in db.get_employees()]
+    items = [(row[0], row[2]) for row in db.get_items()]
+    start = datetime.now() - timedelta(days=days)
+    random.seed(42)
+
+    cursor = db.conn.cursor()
+    cursor.execute("BEGIN")
+    order_id = cursor.execute("SELECT COALESCE(MAX(order_id), 0) FROM orders").fetchone()[0]
+    orders, order_lines = [], []
+    for _ in range(lines // lines_per_order):
+        order_id += 1
+        created = start + timedelta(seconds=random.randrange(days * 86400))
+        cart = [random.choice(items) for _ in range(lines_per_order)]
+        total = 0
+        for item_id, cost in cart:
+            qty = random.randint(1, 3)
+            total += cost * qty
+            order_lines.append((order_id, item_id, qty, cost))
+        orders.append((order_id, random.choice(employees), total,
+                       created.strftime('%Y-%m-%d %H:%M:%S'), int(created.timestamp())))
+        if len(order_lines) >= 500000:
+            flush_history(cursor, orders, order_lines)
+    flush_history(cursor, orders, order_lines)
+    db.conn.commit()
+    db.rebuild_sales_rollups()
+
+def flush_history(cursor, orders, order_lines):
+    cursor.executemany(
+        "INSERT INTO orders(order_id, emp_id, total_order_cost, created_at, created_ts) VALUES(?, ?, ?, ?, ?)", orders
+    )
+    cursor.executemany(
+        "INSERT INTO order_items(order_id, item_id, quantity, unit_price) VALUES(?, ?, ?, ?)", order_lines
+    )
+    orders.clear()
+    order_lines.clear()
+
+def time_query(db, engine, call, repeat=3):
+    """Best-of-`repeat` milliseconds for call(db) with the given analytics engine."""
+    db.analytics_engine = engine
+    best = None
+    for _ in range(repeat):
+        db._kpi_cache.clear()  # measure the query, not the KPI cache
+        start = time.perf_counter()
+        call(db)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def benchmark_analytics(db, lines):
+    """Compare the SQL and NumPy analytics engines on a large order history."""
+    print(f"\n📈 ANALYTICS ({lines:,} order lines)")
+    print("-" * 40)
+    if np is None:
+        print("⚠️  NumPy is not installed; skipping")
+        return
+
+    start = time.perf_counter()
+    generate_history(db, lines)
+    print(f"  generated history in {time.perf_counter() - start:.1f} s")
+
+    engine = ColumnarEngine()
+    start = time.perf_counter()
+    engine.sync(db.conn)
+    print(f"  columnar engine initial load {time.perf_counter() - start:.1f} s")
+
+    now = datetime.now()
+    fmt = '%Y-%m-%d %H:%M:%S'
+    month = ((now - timedelta(days=30, hours=7)).strftime(fmt), now.strftime(fmt))  # partial-day edges
+    queries = [
+        ("kpis all", lambda d: d.get_kpis()),
+        ("kpis 30d", lambda d: d.get_kpis(*month)),
+        ("items all", lambda d: d.get_top_items(10)),
+        ("items 30d", lambda d: d.get_top_items(10, *month)),
+        ("spend all", lambda d: d.get_employee_spend(10)),
+        ("spend 30d", lambda d: d.get_employee_spend(10, *month)),
+        ("hourly 30d", lambda d: d.get_hourly_revenue(*month)),
+    ]
+    print(f"  {'query':<12}{'sql':>12}{'numpy':>12}")
+    for label, call in queries:
+        sql_ms = time_query(db, None, call)
+        numpy_ms = time_query(db, engine, call)
+        print(f"  {label:<12}{sql_ms:>9.1f} ms{numpy_ms:>9.1f} ms   {sql_ms / numpy_ms:6.1f}x")
+    db.analytics_engine = None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark database hot paths")
+    parser.add_argument("--orders", type=int, default=500, help="orders to place per variant")
+    parser.add_argument("--lines", type=int, default=5, help="cart lines per order")
+    parser.add_argument("--analytics-lines", type=int, default=5000000,
+                        help="order lines generated for the analytics comparison (0 to skip)")
+    args = parser.parse_args()
+    configure_logging()
+
+    print("=" * 60)
+    print("ORDER MANAGEMENT SYSTEM - DATABASE BENCHMARK")
+    print("=" * 60)
+
+    db = Database(BENCHMARK_DB)
+    db_files = db.conn.execute("PRAGMA database_list").fetchone()[2]
+    logging.disable(logging.INFO)
+    try:
+        benchmark_place_order(db, args.orders, args.lines)
+        if args.analytics_lines:
+            benchmark_analytics(db, args.analytics_lines)
+    finally:
+        logging.disable(logging.NOTSET)
+        db.conn.close()
+        for path in glob.glob(db_files + "*"):
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
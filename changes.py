@@ -0,0 +1,104 @@
+"""
+Change notifications for the database.
+
+Database write methods publish the kinds of data they changed on a ChangeBus
+shared by a Database and all of its clones. Every publish bumps a single,
+monotonically increasing version, so a view can remember the version it last
+rendered (with a ChangeTracker) and skip refreshing until something it shows
+has actually changed.
+"""
+
+import threading
+from contextlib import contextmanager
+
+EMPLOYEE = "employee"
+ITEM = "item"
+MENU = "menu"
+ORDER = "order"
+SETTLEMENT = "settlement"
+
+CHANGE_KINDS = (EMPLOYEE, ITEM, MENU, ORDER, SETTLEMENT)
+
+
+class ChangeBus:
+    """Per-kind change versions, safe to use from several threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._versions = dict.fromkeys(CHANGE_KINDS, 0)
+
+    def publish(self, *kinds):
+        """Record that kinds changed and return the new version."""
+        unknown = set(kinds) - set(CHANGE_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown change kind(s): {sorted(unknown)}")
+        with self._lock:
+            self._version += 1
+            for kind in kinds:
+                self._versions[kind] = self._version
+            return self._version
+
+    def version(self, *kinds):
+        """Return the version of the latest change to any of kinds (default: all)."""
+        with self._lock:
+            if not kinds:
+                return self._version
+            return max(self._versions[kind] for kind in kinds)
+
+    def changed_since(self, version):
+        """Return the kinds that changed after version."""
+        with self._lock:
+            return {kind for kind, changed in self._versions.items() if changed > version}
+
+
+class ChangeTracker:
+    """Remembers what a view last rendered, so it can skip needless refreshes.
+
+    Usage in a refresh method:
+
+        token = self.changes.stale()
+        if token is None:
+            return  # nothing the view shows has changed
+        ...load and render...
+        self.changes.mark(token)
+
+    key is anything else the rendered data depends on, e.g. a date range.
+    """
+
+    def __init__(self, db, *kinds):
+        self.db = db
+        self.kinds = kinds or CHANGE_KINDS
+        self._rendered = None  # (version, key)
+
+    def stale(self, key=None):
+        """Return a token to pass to mark() if the view is out of date, else None."""
+        token = (self.db.change_version(*self.kinds), key)
+        return None if token == self._rendered else token
+
+    def changed_kinds(self):
+        """Return the watched kinds that changed since the last mark (all if never rendered)."""
+        if self._rendered is None:
+            return set(self.kinds)
+        return self.db.changes.changed_since(self._rendered[0]) & set(self.kinds)
+
+    def mark(self, token):
+        """Record that the view now shows the data as of token."""
+        self._rendered = token
+
+    @contextmanager
+    def local_change(self):
+        """Wrap a write whose effect the view has already applied to itself.
+
+        If the view was up to date before the write, it still counts as up
+        to date afterwards, so the next refresh is skipped.
+        """
+        key = self._rendered[1] if self._rendered else None
+        was_current = self._rendered is not None and self.stale(key) is None
+        yield
+        if was_current:
+            self.mark(self.stale(key) or self._rendered)
+
+    def reset(self):
+        """Make the next stale() call report the view as out of date."""
+        self._rendered = None
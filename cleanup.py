@@ -6,7 +6,7 @@ import shutil
 PROJECT_FOLDER = os.path.dirname(os.path.abspath(__file__))
 
 # File extensions to delete
-FILE_EXTENSIONS = ['.pyc', '.pyo', '.db', '.sqlite']
+FILE_EXTENSIONS = ['.pyc', '.pyo', '.db', '.db-wal', '.db-shm', '.sqlite']
 
 # Folders to delete completely (optional)
 FOLDERS_TO_DELETE = ['__pycache__']
@@ -2,10 +2,221 @@ import sqlite3
 import logging
 import os
 import sys
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, time as dt_time, timedelta
+from itertools import chain, groupby
+
+from analytics_engine import create_engine
+from changes import ChangeBus, CHANGE_KINDS, EMPLOYEE, ITEM, MENU, ORDER, SETTLEMENT
+from db_profiling import profile_from_env
+
+# Log categories; log_config gives reads and writes their own levels.
+log = logging.getLogger("oms.db")
+read_log = logging.getLogger("oms.db.read")
+write_log = logging.getLogger("oms.db.write")
+
+# Performance settings applied to every connection as PRAGMAs. Each one can
+# be overridden with an OMS_DB_<NAME> environment variable, for example
+# OMS_DB_SYNCHRONOUS=FULL or OMS_DB_CACHE_SIZE=-65536.
+DEFAULT_CONNECTION_PROFILE = {
+    "journal_mode": "WAL",       # readers no longer block the writer
+    "synchronous": "NORMAL",     # fsync at checkpoints, not on every commit
+    "busy_timeout": 5000,        # ms to wait for a lock before failing
+    "cache_size": -20000,        # negative means KiB, so ~20 MB of page cache
+    "mmap_size": 268435456,      # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",      # sorts and temp tables stay in RAM
+}
+
+def load_connection_profile(overrides=None):
+    """Return the connection profile: defaults, then environment, then overrides."""
+    profile = dict(DEFAULT_CONNECTION_PROFILE)
+    for name in profile:
+        value = os.environ.get(f"OMS_DB_{name.upper()}")
+        if value:
+            profile[name] = value
+    if overrides:
+        profile.update(overrides)
+
+    # PRAGMA values cannot be bound as parameters, so only allow plain
+    # integers and keywords through.
+    for name, value in profile.items():
+        text = str(value).strip()
+        if not (text.lstrip("-").isdigit() or text.isalpha()):
+            raise ValueError(f"Invalid value for {name} in connection profile: {value!r}")
+        profile[name] = int(text) if text.lstrip("-").isdigit() else text.upper()
+    return profile
+
+def _create_employee_search_index(cursor):
+    """Trigram full-text index over employee IDs and names, kept in sync by triggers.
+
+    Builds without FTS5 or the trigram tokenizer (SQLite < 3.34) skip this
+    step; search_employees then falls back to a plain substring scan.
+    """
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE employees_fts USING fts5(
+                emp_id, emp_name, content='employees', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as exc:
+        log.warning(f"Employee search index unavailable, using substring scan: {exc}")
+        return
+
+    cursor.execute("""
+        CREATE TRIGGER employees_fts_insert AFTER INSERT ON employees BEGIN
+            INSERT INTO employees_fts(rowid, emp_id, emp_name) VALUES (new.id, new.emp_id, new.emp_name);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER employees_fts_delete AFTER DELETE ON employees BEGIN
+            INSERT INTO employees_fts(employees_fts, rowid, emp_id, emp_name)
+            VALUES ('delete', old.id, old.emp_id, old.emp_name);
+        END
+    """)
+    # Only ID/name edits touch the index; amount_due changes on every order.
+    cursor.execute("""
+        CREATE TRIGGER employees_fts_update AFTER UPDATE OF emp_id, emp_name ON employees BEGIN
+            INSERT INTO employees_fts(employees_fts, rowid, emp_id, emp_name)
+            VALUES ('delete', old.id, old.emp_id, old.emp_name);
+            INSERT INTO employees_fts(rowid, emp_id, emp_name) VALUES (new.id, new.emp_id, new.emp_name);
+        END
+    """)
+    cursor.execute("INSERT INTO employees_fts(employees_fts) VALUES ('rebuild')")
+
+def _rebuild_sales_rollups(cursor):
+    """Recompute daily_sales and daily_item_sales from the raw order tables."""
+    cursor.execute("DELETE FROM daily_sales")
+    cursor.execute("DELETE FROM daily_item_sales")
+    cursor.execute("""
+        INSERT INTO daily_sales(day, order_count, revenue)
+        SELECT COALESCE(substr(created_at, 1, 10), ''), COUNT(*), COALESCE(SUM(total_order_cost), 0)
+        FROM orders
+        GROUP BY 1
+    """)
+    cursor.execute("""
+        INSERT INTO daily_item_sales(day, item_id, quantity, revenue)
+        SELECT COALESCE(substr(o.created_at, 1, 10), ''), oi.item_id, SUM(oi.quantity),
+               COALESCE(SUM(oi.quantity * oi.unit_price), 0)
+        FROM order_items oi
+        JOIN orders o ON oi.order_id = o.order_id
+        GROUP BY 1, 2
+    """)
+
+def _create_sales_rollups(cursor):
+    """Per-day and per-day-per-item sales totals for Analytics.
+
+    place_order and delete_order keep them current. Orders without a
+    created_at are filed under the day '', which only all-time totals read.
+    order_items also gets the unit price charged, so deleting an order
+    subtracts exactly what it added even after the item's price changed;
+    existing lines are backfilled with the current price.
+    """
+    cursor.execute("ALTER TABLE order_items ADD COLUMN unit_price REAL")
+    cursor.execute("""
+        UPDATE order_items
+        SET unit_price = (SELECT cost FROM items WHERE items.item_id = order_items.item_id)
+    """)
+    cursor.execute("""
+        CREATE TABLE daily_sales (
+            day TEXT PRIMARY KEY,
+            order_count INTEGER NOT NULL,
+            revenue REAL NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE daily_item_sales (
+            day TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            revenue REAL NOT NULL,
+            PRIMARY KEY (day, item_id)
+        ) WITHOUT ROWID
+    """)
+    _rebuild_sales_rollups(cursor)
+
+def _parse_timestamp(value, end_of_day=False):
+    """Parse 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DD' (midnight, or 23:59:59 if end_of_day)."""
+    if len(value) == 10:
+        day = datetime.strptime(value, "%Y-%m-%d")
+        return day.replace(hour=23, minute=59, second=59) if end_of_day else day
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+def _to_epoch(value, end_of_day=False):
+    """Local 'YYYY-MM-DD[ HH:MM:SS]' timestamp -> Unix seconds, as stored in orders.created_ts."""
+    return int(_parse_timestamp(value, end_of_day).timestamp())
+
+def _epoch_range(date_from, date_to):
+    """(start, end) created_ts bounds for an optional date range, or (None, None)."""
+    if date_from and date_to:
+        return _to_epoch(date_from), _to_epoch(date_to, end_of_day=True)
+    return None, None
+
+def _split_date_range(date_from, date_to):
+    """Split an inclusive local-time range into whole days and partial-day edges.
+
+    Returns (days, edges). days is a (first, last) pair of ISO dates whose
+    totals can be read from the rollups, or None if the range covers no whole
+    day. edges are inclusive (start, end) created_ts ranges that have to be
+    read from the raw orders.
+    """
+    start = _parse_timestamp(date_from)
+    end = _parse_timestamp(date_to, end_of_day=True)
+    first_day = start.date() if start.time() == dt_time.min else start.date() + timedelta(days=1)
+    last_day = end.date() if end.time() >= dt_time(23, 59, 59) else end.date() - timedelta(days=1)
+
+    epoch = lambda moment: int(moment.timestamp())
+    if first_day > last_day:
+        return None, [(epoch(start), epoch(end))]
+
+    edges = []
+    first_midnight = datetime.combine(first_day, dt_time.min)
+    if start < first_midnight:
+        edges.append((epoch(start), epoch(first_midnight) - 1))
+    next_midnight = datetime.combine(last_day + timedelta(days=1), dt_time.min)
+    if end >= next_midnight:
+        edges.append((epoch(next_midnight), epoch(end)))
+    return (first_day.isoformat(), last_day.isoformat()), edges
+
+def _add_created_ts(cursor):
+    """orders.created_ts: created_at as Unix seconds, so range filters compare integers.
+
+    created_at stays the local-time text shown to users and used for the
+    rollup days; its index is replaced by one on created_ts.
+    """
+    cursor.execute("ALTER TABLE orders ADD COLUMN created_ts INTEGER")
+    cursor.execute("""
+        UPDATE orders
+        SET created_ts = CAST(strftime('%s', created_at, 'utc') AS INTEGER)
+        WHERE created_at IS NOT NULL
+    """)
+    cursor.execute("CREATE INDEX idx_orders_created_ts ON orders(created_ts)")
+    cursor.execute("DROP INDEX IF EXISTS idx_orders_created_at")
+
+# Schema migrations, applied in order on startup. PRAGMA user_version records
+# how many of them a database file has already been through, so each step
+# runs exactly once per file. A step is a list of SQL statements or a
+# function taking a cursor. Only ever append to this list.
+SCHEMA_MIGRATIONS = [
+    # 1: secondary indexes for the hot query paths
+    [
+        "CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items(order_id)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_emp_id ON orders(emp_id)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_amount_due ON employees(amount_due)",
+    ],
+    # 2: trigram index for employee autocomplete
+    _create_employee_search_index,
+    # 3: daily sales rollups for Analytics, plus order_items.unit_price
+    _create_sales_rollups,
+    # 4: integer epoch timestamps on orders
+    _add_created_ts,
+]
+
+STREAM_CHUNK_SIZE = 500  # rows per fetchmany() in the iter_* methods
+KPI_CACHE_SIZE = 16      # date ranges whose KPIs get_kpis keeps in memory
 
 class Database:
-    def __init__(self, db_name="orders.db"):
+    def __init__(self, db_name="orders.db", profile=None):
         # --- Determine database path ---
         if getattr(sys, 'frozen', False):
             # Running as compiled executable
@@ -21,23 +232,44 @@ class Database:
         # Database file path
         db_path = os.path.join(data_dir, db_name)
         
-        # --- Setup logs directory and file ---
-        log_dir = os.path.join(base_path, "logs")
-        os.makedirs(log_dir, exist_ok=True)
-        log_filename = f"db_{datetime.now().strftime('%Y-%m-%d')}.log"
-        log_path = os.path.join(log_dir, log_filename)
-
-        logging.basicConfig(
-            filename=log_path,
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s"
-        )
-        logging.info(f"Database initialized at: {db_path}")
+        # Logging is set up by the entry point (log_config.configure_logging)
+        log.info(f"Database initialized at: {db_path}")
 
         # --- Setup DB ---
-        self.conn = sqlite3.connect(db_path)
+        self.db_path = db_path
+        self.profile = load_connection_profile(profile)
+        self.changes = ChangeBus()  # shared with every clone
+        self.analytics_engine = create_engine()  # None unless OMS_ANALYTICS_ENGINE=numpy
+        self.conn = self.connect()
+        self._reset_cache()
         self.create_tables()
 
+    def connect(self):
+        """Open a new connection to the database file with the connection profile applied."""
+        conn = sqlite3.connect(self.db_path, timeout=self.profile["busy_timeout"] / 1000)
+        for name, value in self.profile.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        effective = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in self.profile}
+        log.info("Connection profile applied: " + ", ".join(f"{k}={v}" for k, v in effective.items()))
+        return conn
+
+    def clone(self):
+        """Return a Database on the same file with its own connection.
+
+        sqlite3 connections must only be used on the thread that opened them,
+        so call this from the thread that will use the copy.
+        """
+        other = Database.__new__(Database)
+        other.db_path = self.db_path
+        other.profile = self.profile
+        other.changes = self.changes
+        other.analytics_engine = self.analytics_engine
+        other.conn = other.connect()
+        other._reset_cache()
+        other._detect_features()
+        return other
+
     def create_tables(self):
         cursor = self.conn.cursor()
         cursor.executescript("""
@@ -77,7 +309,7 @@ class Database:
         );
         """)
         self.conn.commit()
-        logging.info("Tables created/verified")
+        log.info("Tables created/verified")
 
         # Ensure created_at column exists in orders for older DBs
         try:
@@ -86,36 +318,249 @@ class Database:
             if 'created_at' not in cols:
                 cursor.execute("ALTER TABLE orders ADD COLUMN created_at TEXT")
                 self.conn.commit()
-                logging.info("Added created_at column to orders table")
+                log.info("Added created_at column to orders table")
         except Exception as exc:
-            logging.warning(f"Could not verify/add created_at column: {exc}")
+            log.warning(f"Could not verify/add created_at column: {exc}")
+
+        self.migrate()
+
+    def migrate(self):
+        """Bring the schema up to date by applying pending SCHEMA_MIGRATIONS."""
+        cursor = self.conn.cursor()
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for target, step in enumerate(SCHEMA_MIGRATIONS[version:], start=version + 1):
+            try:
+                cursor.execute("BEGIN")
+                if callable(step):
+                    step(cursor)
+                else:
+                    for statement in step:
+                        cursor.execute(statement)
+                # PRAGMA does not accept bound parameters
+                cursor.execute(f"PRAGMA user_version = {int(target)}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                log.exception(f"Schema migration to version {target} failed")
+                raise
+            log.info(f"Schema migrated to version {target}")
+
+        self._detect_features()
+
+    def _detect_features(self):
+        """Record which optional schema objects this database file has."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='employees_fts'")
+        self.has_employee_search_index = cursor.fetchone() is not None
+
+    def explain_query_plan(self, sql, params=()):
+        """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+        cursor = self.conn.cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [row[3] for row in cursor.fetchall()]
+
+    # ---------------- READ CACHE AND CHANGES ----------------
+    # Employees, items and today's menu are served from memory between writes.
+    # Write methods call publish() with the kinds of data they changed, which
+    # drops the cache entries those kinds feed and bumps the shared change
+    # version. PRAGMA data_version catches commits made through any other
+    # connection or process.
+    CACHE_KEYS_BY_CHANGE = {
+        EMPLOYEE: ("employees", "employees_by_emp_id"),
+        ITEM: ("items", "items_by_id", "today_menu"),
+        MENU: ("today_menu",),
+        ORDER: ("employees", "employees_by_emp_id"),  # orders move amount_due
+        SETTLEMENT: ("employees", "employees_by_emp_id"),
+    }
+
+    def _reset_cache(self):
+        self._cache = {}
+        self._kpi_cache = OrderedDict()  # (date_from, date_to) -> (change version, kpis)
+        self._data_version = None
+        self._bus_version = self.changes.version()
+
+    def _check_data_version(self):
+        """Clear the cache if another connection committed since the last check.
+
+        Commits made through clones of this Database have already been
+        published on the shared bus. If the bus has not moved, the commit came
+        from elsewhere (another process); its kind is unknown, so everything
+        counts as changed.
+        """
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        bus_version = self.changes.version()
+        if version != self._data_version:
+            self._cache.clear()
+            if self._data_version is not None and bus_version == self._bus_version:
+                bus_version = self.changes.publish(*CHANGE_KINDS)
+            self._data_version = version
+        self._bus_version = bus_version
+
+    def _cached(self, key, load):
+        """Return the cached value for key, calling load() on a miss."""
+        self._check_data_version()
+        if key not in self._cache:
+            self._cache[key] = load()
+        return self._cache[key]
+
+    def _invalidate(self, *keys):
+        for key in keys:
+            self._cache.pop(key, None)
+
+    def publish(self, *kinds):
+        """Record committed changes to kinds of data; returns the new change version."""
+        for kind in kinds:
+            self._invalidate(*self.CACHE_KEYS_BY_CHANGE[kind])
+        return self.changes.publish(*kinds)
+
+    def change_version(self, *kinds):
+        """Return the version of the latest change to any of kinds (default: all)."""
+        self._check_data_version()
+        return self.changes.version(*kinds)
+
+    def _begin_immediate(self):
+        """Return a cursor inside a new write transaction.
+
+        sqlite3 opens a transaction implicitly before an INSERT or UPDATE, and
+        one that failed (for example on a duplicate emp_id) stays open until
+        rolled back. Roll such a leftover back first so BEGIN IMMEDIATE does
+        not fail with "cannot start a transaction within a transaction".
+        """
+        if self.conn.in_transaction:
+            write_log.warning("Rolling back a transaction left open before starting a new one")
+            self.conn.rollback()
+        cursor = self.conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        return cursor
+
+    # ---------------- PAGING AND STREAMING ----------------
+    # *_page methods use keyset pagination: instead of an OFFSET, the next
+    # page starts after the last row of the previous one, so every page costs
+    # the same. Pass that row's id as after_id and, when sorting by another
+    # column, its value for that column as after_value. iter_* methods stream
+    # a whole table in fetchmany chunks instead of building one big list.
+    def _keyset(self, sort_keys, sort_by, id_column, after_id, after_value, descending):
+        """Return (where, params, order_by) SQL fragments for one keyset page."""
+        if sort_by not in sort_keys:
+            raise ValueError(f"Cannot sort by {sort_by!r}; expected one of {sorted(sort_keys)}")
+        column = sort_keys[sort_by]
+        op, direction = ("<", "DESC") if descending else (">", "ASC")
+        if column == id_column:
+            order_by = f"{id_column} {direction}"
+            if after_id is None:
+                return "", [], order_by
+            return f"WHERE {id_column} {op} ?", [after_id], order_by
+
+        # Ties on the sort column are broken by id so no row is skipped or repeated.
+        order_by = f"{column} {direction}, {id_column} {direction}"
+        if after_id is None:
+            return "", [], order_by
+        return f"WHERE ({column}, {id_column}) {op} (?, ?)", [after_value, after_id], order_by
+
+    def _stream(self, sql, params=(), chunk_size=STREAM_CHUNK_SIZE):
+        """Yield the rows of a query, fetching chunk_size rows at a time."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
 
     # ---------------- MENU METHODS ----------------
     def add_item(self, name, cost):
         cursor = self.conn.cursor()
         cursor.execute("INSERT INTO items(item_name, cost) VALUES(?, ?)", (name, cost))
         self.conn.commit()
-        logging.info(f"Item added: {name}, cost={cost}")
+        self.publish(ITEM)
+        write_log.info("Item added: %s, cost=%s", name, cost)
+
+    def add_items_bulk(self, rows):
+        """Insert many (item_name, cost) rows with one statement and one commit.
+
+        Rows with a blank name or a missing, non-numeric or negative cost count
+        as invalid. Returns a dict with "inserted" and "invalid" counts.
+        """
+        valid = []
+        invalid = 0
+        for row in rows:
+            name = str(row[0]).strip() if len(row) > 0 and row[0] is not None else ""
+            try:
+                cost = float(row[1])
+            except (IndexError, TypeError, ValueError):
+                cost = None
+            if name and cost is not None and cost >= 0:
+                valid.append((name, cost))
+            else:
+                invalid += 1
+
+        cursor = self._begin_immediate()
+        try:
+            cursor.executemany("INSERT INTO items(item_name, cost) VALUES(?, ?)", valid)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.publish(ITEM)
+
+        result = {"inserted": len(valid), "invalid": invalid}
+        write_log.info("Bulk item import: %s", result)
+        return result
 
     def get_items(self):
+        """Return all (item_id, item_name, cost) rows. The list is cached; do not modify it."""
+        def load():
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT item_id, item_name, cost FROM items")
+            items = cursor.fetchall()
+            read_log.info("Fetched all items")
+            return items
+        return self._cached("items", load)
+
+    def get_items_page(self, limit=100, after_id=None, sort_by="item_id", after_value=None, descending=False):
+        """Return one keyset page of (item_id, item_name, cost) rows.
+
+        sort_by is "item_id", "item_name" or "cost".
+        """
+        where, params, order_by = self._keyset(
+            {"item_id": "item_id", "item_name": "item_name", "cost": "cost"},
+            sort_by, "item_id", after_id, after_value, descending
+        )
         cursor = self.conn.cursor()
-        cursor.execute("SELECT item_id, item_name, cost FROM items")
+        cursor.execute(
+            f"SELECT item_id, item_name, cost FROM items {where} ORDER BY {order_by} LIMIT ?",
+            params + [limit]
+        )
         items = cursor.fetchall()
-        logging.info("Fetched all items")
+        read_log.info("Fetched page of %d items", len(items))
         return items
 
+    def iter_items(self, chunk_size=STREAM_CHUNK_SIZE):
+        """Yield every (item_id, item_name, cost) row in item_id order."""
+        return self._stream("SELECT item_id, item_name, cost FROM items ORDER BY item_id", chunk_size=chunk_size)
+
+    def get_item(self, item_id):
+        """Return the (item_id, item_name, cost) row for item_id, or None."""
+        items = self._cached("items_by_id", lambda: {row[0]: row for row in self.get_items()})
+        return items.get(item_id)
+
     def update_item(self, item_id, new_name, new_cost):
         cursor = self.conn.cursor()
         cursor.execute("UPDATE items SET item_name=?, cost=? WHERE item_id=?", (new_name, new_cost, item_id))
         self.conn.commit()
-        logging.info(f"Item updated: id={item_id}, new_name={new_name}, new_cost={new_cost}")
+        self.publish(ITEM)
+        write_log.info("Item updated: id=%s, new_name=%s, new_cost=%s", item_id, new_name, new_cost)
 
     def delete_item(self, item_id):
         cursor = self.conn.cursor()
         cursor.execute("DELETE FROM items WHERE item_id=?", (item_id,))
         cursor.execute("DELETE FROM today_menu WHERE item_id=?", (item_id,))
         self.conn.commit()
-        logging.info(f"Item deleted: id={item_id}")
+        self.publish(ITEM, MENU)
+        write_log.info("Item deleted: id=%s", item_id)
 
     def set_today_menu(self, item_ids):
         cursor = self.conn.cursor()
@@ -123,83 +568,257 @@ class Database:
         for iid in item_ids:
             cursor.execute("INSERT INTO today_menu(item_id) VALUES(?)", (iid,))
         self.conn.commit()
-        logging.info(f"Today menu set: {item_ids}")
+        self.publish(MENU)
+        write_log.info("Today menu set: %s", item_ids)
 
     def get_today_menu(self):
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT i.item_id, i.item_name, i.cost 
-            FROM items i
-            JOIN today_menu t ON i.item_id = t.item_id
-        """)
-        menu = cursor.fetchall()
-        logging.info("Fetched today's menu")
-        return menu
+        """Return today's (item_id, item_name, cost) rows. The list is cached; do not modify it."""
+        def load():
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT i.item_id, i.item_name, i.cost 
+                FROM items i
+                JOIN today_menu t ON i.item_id = t.item_id
+            """)
+            menu = cursor.fetchall()
+            read_log.info("Fetched today's menu")
+            return menu
+        return self._cached("today_menu", load)
 
     # ---------------- EMPLOYEE METHODS ----------------
     def add_employee(self, emp_id, emp_name):
+        """Add an employee; returns the new row id, or False if emp_id already exists."""
         cursor = self.conn.cursor()
         try:
             cursor.execute("INSERT INTO employees(emp_id, emp_name) VALUES(?, ?)", (emp_id, emp_name))
             self.conn.commit()
-            logging.info(f"Employee added: emp_id={emp_id}, name={emp_name}")
-            return True
+            self.publish(EMPLOYEE)
+            write_log.info("Employee added: emp_id=%s, name=%s", emp_id, emp_name)
+            return cursor.lastrowid
         except sqlite3.IntegrityError:
-            logging.warning(f"Duplicate employee ID attempted: {emp_id}")
+            self.conn.rollback()
+            write_log.warning("Duplicate employee ID attempted: %s", emp_id)
             return False  # Duplicate emp_id
 
+    def add_employees_bulk(self, rows):
+        """Insert many (emp_id, emp_name) rows with one statement and one commit.
+
+        Rows with a missing ID or name count as invalid. IDs that already exist,
+        or repeat earlier in rows, count as duplicates and are left untouched.
+        Returns a dict with "inserted", "duplicates" and "invalid" counts.
+        """
+        valid = []
+        invalid = 0
+        for row in rows:
+            emp_id = str(row[0]).strip() if len(row) > 0 and row[0] is not None else ""
+            emp_name = str(row[1]).strip() if len(row) > 1 and row[1] is not None else ""
+            if emp_id and emp_name:
+                valid.append((emp_id, emp_name))
+            else:
+                invalid += 1
+
+        cursor = self._begin_immediate()
+        try:
+            cursor.executemany("INSERT OR IGNORE INTO employees(emp_id, emp_name) VALUES(?, ?)", valid)
+            inserted = max(cursor.rowcount, 0)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.publish(EMPLOYEE)
+
+        result = {"inserted": inserted, "duplicates": len(valid) - inserted, "invalid": invalid}
+        write_log.info("Bulk employee import: %s", result)
+        return result
+
     def get_employees(self):
+        """Return all (id, emp_id, emp_name, amount_due) rows. The list is cached; do not modify it."""
+        def load():
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT id, emp_id, emp_name, amount_due FROM employees")
+            employees = cursor.fetchall()
+            read_log.info("Fetched all employees")
+            return employees
+        return self._cached("employees", load)
+
+    def get_employees_page(self, limit=100, after_id=None, sort_by="id", after_value=None, descending=False):
+        """Return one keyset page of (id, emp_id, emp_name, amount_due) rows.
+
+        sort_by is "id", "emp_id", "emp_name" or "amount_due".
+        """
+        where, params, order_by = self._keyset(
+            {"id": "id", "emp_id": "emp_id", "emp_name": "emp_name", "amount_due": "amount_due"},
+            sort_by, "id", after_id, after_value, descending
+        )
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id, emp_id, emp_name, amount_due FROM employees")
+        cursor.execute(
+            f"SELECT id, emp_id, emp_name, amount_due FROM employees {where} ORDER BY {order_by} LIMIT ?",
+            params + [limit]
+        )
         employees = cursor.fetchall()
-        logging.info("Fetched all employees")
+        read_log.info("Fetched page of %d employees", len(employees))
         return employees
 
-    def update_employee(self, id, emp_id, emp_name, amount_due):
+    def iter_employees(self, chunk_size=STREAM_CHUNK_SIZE):
+        """Yield every (id, emp_id, emp_name, amount_due) row in id order."""
+        return self._stream("SELECT id, emp_id, emp_name, amount_due FROM employees ORDER BY id", chunk_size=chunk_size)
+
+    def get_employee(self, emp_id):
+        """Return the (id, emp_id, emp_name, amount_due) row for emp_id, or None."""
+        employees = self._cached("employees_by_emp_id", lambda: {row[1]: row for row in self.get_employees()})
+        return employees.get(emp_id)
+
+    def search_employees(self, text, limit=20, order_by="relevance"):
+        """Return up to limit employees whose ID or name contains text.
+
+        Rows are (id, emp_id, emp_name, amount_due). order_by="relevance" puts
+        exact ID matches first, then prefix matches, then the best full-text
+        matches; order_by="amount_due" lists the largest dues first. Queries of
+        three or more characters use the trigram index when it is available.
+        """
+        text = text.strip().lower()
+        if not text:
+            return []
+        if order_by not in ("relevance", "amount_due"):
+            raise ValueError(f"Unsupported order_by: {order_by}")
+
         cursor = self.conn.cursor()
+        if self.has_employee_search_index and len(text) >= 3:
+            rank = "f.rank" if order_by == "relevance" else "e.amount_due DESC"
+            source = "employees_fts f JOIN employees e ON e.id = f.rowid"
+            where = "employees_fts MATCH :phrase"
+        else:
+            rank = "e.emp_name" if order_by == "relevance" else "e.amount_due DESC"
+            source = "employees e"
+            where = "instr(lower(e.emp_id), :text) > 0 OR instr(lower(e.emp_name), :text) > 0"
+
+        if order_by == "relevance":
+            rank = f"""
+                lower(e.emp_id) = :text DESC,
+                (instr(lower(e.emp_id), :text) = 1 OR instr(lower(e.emp_name), :text) = 1) DESC,
+                {rank}
+            """
         cursor.execute(
-            "UPDATE employees SET emp_id=?, emp_name=?, amount_due=? WHERE id=?",
-            (emp_id, emp_name, amount_due, id)
+            f"""
+            SELECT e.id, e.emp_id, e.emp_name, e.amount_due
+            FROM {source}
+            WHERE {where}
+            ORDER BY {rank}
+            LIMIT :limit
+            """,
+            {"text": text, "phrase": '"' + text.replace('"', '""') + '"', "limit": limit}
         )
+        employees = cursor.fetchall()
+        read_log.info("Searched employees: %r -> %d match(es)", text, len(employees))
+        return employees
+
+    def update_employee(self, id, emp_id, emp_name, amount_due):
+        """Update one employee; raises sqlite3.IntegrityError if emp_id belongs to another employee."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                "UPDATE employees SET emp_id=?, emp_name=?, amount_due=? WHERE id=?",
+                (emp_id, emp_name, amount_due, id)
+            )
+        except sqlite3.IntegrityError:
+            self.conn.rollback()
+            raise
         self.conn.commit()
-        logging.info(f"Employee updated: id={id}, emp_id={emp_id}, name={emp_name}, amount_due={amount_due}")
+        self.publish(EMPLOYEE)
+        write_log.info("Employee updated: id=%s, emp_id=%s, name=%s, amount_due=%s", id, emp_id, emp_name, amount_due)
+
+    def update_employees_bulk(self, rows):
+        """Apply many (id, emp_id, emp_name, amount_due) edits in one transaction.
+
+        Returns the ids whose edit was rejected because the new emp_id
+        belongs to another employee; every other edit is committed.
+        """
+        rejected = []
+        cursor = self._begin_immediate()
+        try:
+            for id, emp_id, emp_name, amount_due in rows:
+                try:
+                    cursor.execute(
+                        "UPDATE employees SET emp_id=?, emp_name=?, amount_due=? WHERE id=?",
+                        (emp_id, emp_name, amount_due, id)
+                    )
+                except sqlite3.IntegrityError:
+                    rejected.append(id)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.publish(EMPLOYEE)
+        write_log.info("Bulk employee update: %d updated, %d rejected", len(rows) - len(rejected), len(rejected))
+        return rejected
 
     def delete_employee(self, id):
         cursor = self.conn.cursor()
         cursor.execute("DELETE FROM employees WHERE id=?", (id,))
         self.conn.commit()
-        logging.info(f"Employee deleted: id={id}")
+        self.publish(EMPLOYEE)
+        write_log.info("Employee deleted: id=%s", id)
 
     def adjust_employee_due(self, id, amount_change):
         cursor = self.conn.cursor()
         cursor.execute("UPDATE employees SET amount_due = amount_due + ? WHERE id=?", (amount_change, id))
         self.conn.commit()
-        logging.info(f"Adjusted employee due: id={id}, change={amount_change}")
+        self.publish(EMPLOYEE)
+        write_log.info("Adjusted employee due: id=%s, change=%s", id, amount_change)
 
     # ---------------- ORDER METHODS ----------------
     def place_order(self, emp_id, items_with_qty):
-        cursor = self.conn.cursor()
+        """Record an order and charge it to the employee in one transaction.
 
-        total = 0
-        for item_id, qty in items_with_qty:
-            cursor.execute("SELECT cost FROM items WHERE item_id=?", (item_id,))
-            price = cursor.fetchone()[0]
-            total += price * qty
+        Prices for every line are looked up with a single query. Raises
+        ValueError, without writing anything, if the cart is empty or refers
+        to item IDs that do not exist.
+        """
+        items_with_qty = list(items_with_qty)
+        if not items_with_qty:
+            raise ValueError("Cannot place an empty order")
 
-        now_iso = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute("INSERT INTO orders(emp_id, total_order_cost, created_at) VALUES(?, ?, ?)", (emp_id, total, now_iso))
-        order_id = cursor.lastrowid
+        item_ids = sorted({item_id for item_id, _ in items_with_qty})
+        placeholders = ",".join("?" * len(item_ids))
+        cursor = self._begin_immediate()
+        try:
+            cursor.execute(f"SELECT item_id, cost FROM items WHERE item_id IN ({placeholders})", item_ids)
+            prices = dict(cursor.fetchall())
+            missing = [item_id for item_id in item_ids if item_id not in prices]
+            if missing:
+                raise ValueError(f"Unknown item ID(s): {', '.join(map(str, missing))}")
 
-        for item_id, qty in items_with_qty:
+            total = sum(prices[item_id] * qty for item_id, qty in items_with_qty)
+
+            now = datetime.now().replace(microsecond=0)
+            now_iso = now.strftime('%Y-%m-%d %H:%M:%S')
             cursor.execute(
-                "INSERT INTO order_items(order_id, item_id, quantity) VALUES(?, ?, ?)",
-                (order_id, item_id, qty)
+                "INSERT INTO orders(emp_id, total_order_cost, created_at, created_ts) VALUES(?, ?, ?, ?)",
+                (emp_id, total, now_iso, int(now.timestamp()))
+            )
+            order_id = cursor.lastrowid
+
+            cursor.executemany(
+                "INSERT INTO order_items(order_id, item_id, quantity, unit_price) VALUES(?, ?, ?, ?)",
+                [(order_id, item_id, qty, prices[item_id]) for item_id, qty in items_with_qty]
             )
 
-        cursor.execute("UPDATE employees SET amount_due = amount_due + ? WHERE emp_id=?", (total, emp_id))
+            cursor.execute("UPDATE employees SET amount_due = amount_due + ? WHERE emp_id=?", (total, emp_id))
 
-        self.conn.commit()
-        logging.info(f"Order placed: emp_id={emp_id}, order_id={order_id}, total={total}")
+            quantities = {}
+            for item_id, qty in items_with_qty:
+                quantities[item_id] = quantities.get(item_id, 0) + qty
+            self._add_to_rollups(
+                cursor, now_iso[:10], 1, total,
+                [(item_id, qty, qty * prices[item_id]) for item_id, qty in quantities.items()]
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.publish(ORDER)
+
+        write_log.info("Order placed: emp_id=%s, order_id=%s, total=%s", emp_id, order_id, total)
         return order_id
 
     def get_orders(self):
@@ -210,14 +829,85 @@ class Database:
             JOIN employees e ON o.emp_id = e.emp_id
         """)
         orders = cursor.fetchall()
-        logging.info("Fetched all orders")
+        read_log.info("Fetched all orders")
+        return orders
+
+    def get_orders_page(self, limit=100, after_id=None, sort_by="order_id", after_value=None, descending=False):
+        """Return one keyset page of (order_id, emp_name, total_order_cost) rows.
+
+        sort_by is "order_id" or "total_order_cost".
+        """
+        where, params, order_by = self._keyset(
+            {"order_id": "o.order_id", "total_order_cost": "o.total_order_cost"},
+            sort_by, "o.order_id", after_id, after_value, descending
+        )
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT o.order_id, e.emp_name, o.total_order_cost
+            FROM orders o
+            JOIN employees e ON o.emp_id = e.emp_id
+            {where}
+            ORDER BY {order_by}
+            LIMIT ?
+            """,
+            params + [limit]
+        )
+        orders = cursor.fetchall()
+        read_log.info("Fetched page of %d orders", len(orders))
+        return orders
+
+    def iter_orders(self, descending=False, chunk_size=STREAM_CHUNK_SIZE):
+        """Yield every (order_id, emp_name, total_order_cost) row in order_id order."""
+        return self._stream(
+            f"""
+            SELECT o.order_id, e.emp_name, o.total_order_cost
+            FROM orders o
+            JOIN employees e ON o.emp_id = e.emp_id
+            ORDER BY o.order_id {"DESC" if descending else "ASC"}
+            """,
+            chunk_size=chunk_size
+        )
+
+    def get_orders_with_items(self, limit=None, after_id=None, descending=False):
+        """Return orders with their line items aggregated in a single query.
+
+        Each row is (order_id, emp_name, total_order_cost, items_str) where
+        items_str holds one "name xqty" entry per line, newline separated.
+        Rows are ordered by order_id (newest first if descending). For keyset
+        paging pass the last order_id of the previous page as after_id.
+        """
+        cursor = self.conn.cursor()
+        where = ""
+        params = []
+        if after_id is not None:
+            where = " WHERE o.order_id < ?" if descending else " WHERE o.order_id > ?"
+            params.append(after_id)
+        sql = f"""
+            SELECT o.order_id, e.emp_name, o.total_order_cost,
+                   COALESCE(GROUP_CONCAT(i.item_name || ' x' || oi.quantity, char(10)), '')
+            FROM orders o
+            JOIN employees e ON o.emp_id = e.emp_id
+            LEFT JOIN order_items oi ON oi.order_id = o.order_id
+            LEFT JOIN items i ON oi.item_id = i.item_id
+            {where}
+            GROUP BY o.order_id
+            ORDER BY o.order_id {"DESC" if descending else "ASC"}
+        """
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        cursor.execute(sql, params)
+        orders = cursor.fetchall()
+        read_log.info("Fetched %d orders with items", len(orders))
         return orders
 
     def settle_due(self, emp_id):
         cursor = self.conn.cursor()
         cursor.execute("UPDATE employees SET amount_due = 0 WHERE emp_id=?", (emp_id,))
         self.conn.commit()
-        logging.info(f"Settled due for emp_id={emp_id}")
+        self.publish(SETTLEMENT)
+        write_log.info("Settled due for emp_id=%s", emp_id)
 
     def get_order_items(self, order_id):
         cursor = self.conn.cursor()
@@ -228,66 +918,306 @@ class Database:
             WHERE oi.order_id=?
         """, (order_id,))
         items = cursor.fetchall()
-        logging.info(f"Fetched items for order_id={order_id}")
+        read_log.info("Fetched items for order_id=%s", order_id)
         return items
 
-    # ---------------- ANALYTICS METHODS ----------------
-    def get_kpis(self, date_from: str = None, date_to: str = None):
-        """Return high-level KPIs with optional date range on orders.
-        date_from/date_to format: 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DD'.
+    RECEIPT_SQL = """
+        SELECT o.order_id, o.emp_id, COALESCE(e.emp_name, ''), o.created_at,
+               COALESCE(o.total_order_cost, 0),
+               COALESCE(i.item_name, 'Item #' || oi.item_id), oi.quantity,
+               COALESCE(oi.unit_price, i.cost, 0)
+        FROM orders o
+        LEFT JOIN employees e ON e.emp_id = o.emp_id
+        LEFT JOIN order_items oi ON oi.order_id = o.order_id
+        LEFT JOIN items i ON i.item_id = oi.item_id
+        {where}
+        ORDER BY o.order_id, oi.id
+    """
+
+    @staticmethod
+    def _group_receipts(rows):
+        """Turn RECEIPT_SQL rows, ordered by order_id, into one receipt dict per order."""
+        for order_id, order_rows in groupby(rows, key=lambda row: row[0]):
+            first = next(order_rows)
+            _, emp_id, emp_name, created_at, total = first[:5]
+            lines = [(name, qty, price, qty * price)
+                     for *_, name, qty, price in chain([first], order_rows) if qty is not None]
+            yield {
+                "order_id": order_id,
+                "emp_id": emp_id,
+                "emp_name": emp_name,
+                "created_at": created_at,
+                "total": total,
+                "lines": lines,
+            }
+
+    def get_order_receipt(self, order_id):
+        """Return everything a receipt shows for order_id in one query, or None.
+
+        The result is a dict with order_id, emp_id, emp_name, created_at,
+        total and lines, a list of (item_name, quantity, unit_price,
+        line_total). Lines are priced at what was charged when the order was
+        placed, falling back to the current price for orders from before
+        unit prices were recorded.
         """
         cursor = self.conn.cursor()
+        cursor.execute(self.RECEIPT_SQL.format(where="WHERE o.order_id = ?"), (order_id,))
+        receipt = next(self._group_receipts(cursor.fetchall()), None)
+        read_log.info("Fetched receipt for order_id=%s", order_id)
+        return receipt
 
-        where_clause = ""
-        params = []
+    def iter_order_receipts(self, date_from=None, date_to=None, chunk_size=STREAM_CHUNK_SIZE):
+        """Yield a get_order_receipt dict for every order in the date range (all if None).
+
+        Streams a single query, so memory use does not grow with the range.
+        """
+        where, params = "", ()
         if date_from and date_to:
-            where_clause = " WHERE created_at >= ? AND created_at <= ?"
-            params = [date_from, date_to]
+            where, params = "WHERE o.created_ts BETWEEN ? AND ?", _epoch_range(date_from, date_to)
+        return self._group_receipts(self._stream(self.RECEIPT_SQL.format(where=where), params, chunk_size))
 
-        cursor.execute("SELECT COUNT(*) FROM orders" + where_clause, params)
-        total_orders = cursor.fetchone()[0]
+    def iter_employee_statements(self, date_from=None, date_to=None, chunk_size=STREAM_CHUNK_SIZE):
+        """Yield a dues statement for every employee, ordered by emp_id.
 
-        cursor.execute("SELECT COALESCE(SUM(total_order_cost), 0) FROM orders" + where_clause, params)
-        total_revenue = cursor.fetchone()[0] or 0.0
+        Each statement is a dict with emp_id, emp_name, amount_due, orders, a
+        list of (order_id, created_at, total) placed in the date range (all if
+        None), and spent, the sum of those totals.
+        """
+        on_range, params = "", ()
+        if date_from and date_to:
+            on_range, params = "AND o.created_ts BETWEEN ? AND ?", _epoch_range(date_from, date_to)
+        rows = self._stream(
+            f"""
+            SELECT e.emp_id, e.emp_name, COALESCE(e.amount_due, 0),
+                   o.order_id, o.created_at, COALESCE(o.total_order_cost, 0)
+            FROM employees e
+            LEFT JOIN orders o ON o.emp_id = e.emp_id {on_range}
+            ORDER BY e.emp_id, o.order_id
+            """,
+            params, chunk_size
+        )
+        for emp_id, emp_rows in groupby(rows, key=lambda row: row[0]):
+            emp_rows = list(emp_rows)
+            orders = [(order_id, created_at, total)
+                      for *_, order_id, created_at, total in emp_rows if order_id is not None]
+            yield {
+                "emp_id": emp_id,
+                "emp_name": emp_rows[0][1],
+                "amount_due": emp_rows[0][2],
+                "orders": orders,
+                "spent": sum(total for _, _, total in orders),
+            }
+
+    # ---------------- SALES ROLLUPS ----------------
+    # daily_sales and daily_item_sales hold per-day totals so Analytics does
+    # not have to scan every order. They are updated in the same transaction
+    # as the order rows; rebuild_sales_rollups() recomputes them from scratch.
+    def _add_to_rollups(self, cursor, day, orders, revenue, item_lines):
+        """Add orders/revenue to day and each (item_id, quantity, revenue) line to its item row.
+
+        Pass negative amounts to take a deleted order back out.
+        """
+        cursor.execute("""
+            INSERT INTO daily_sales(day, order_count, revenue) VALUES(?, ?, ?)
+            ON CONFLICT(day) DO UPDATE SET
+                order_count = order_count + excluded.order_count,
+                revenue = revenue + excluded.revenue
+        """, (day, orders, revenue))
+        cursor.executemany("""
+            INSERT INTO daily_item_sales(day, item_id, quantity, revenue) VALUES(?, ?, ?, ?)
+            ON CONFLICT(day, item_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                revenue = revenue + excluded.revenue
+        """, [(day, item_id, qty, line_revenue) for item_id, qty, line_revenue in item_lines])
+        if orders < 0:
+            cursor.execute("DELETE FROM daily_sales WHERE day=? AND order_count <= 0", (day,))
+            cursor.execute("DELETE FROM daily_item_sales WHERE day=? AND quantity <= 0", (day,))
 
-        cursor.execute("SELECT COUNT(*) FROM employees")
-        total_employees = cursor.fetchone()[0]
+    def rebuild_sales_rollups(self):
+        """Regenerate the daily sales rollups from the order tables."""
+        cursor = self._begin_immediate()
+        try:
+            _rebuild_sales_rollups(cursor)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.publish(ORDER)
+        days = cursor.execute("SELECT COUNT(*) FROM daily_sales").fetchone()[0]
+        write_log.info("Sales rollups rebuilt for %d day(s)", days)
+        return days
 
-        cursor.execute("SELECT COALESCE(SUM(amount_due), 0) FROM employees")
-        total_due = cursor.fetchone()[0] or 0.0
+    # ---------------- ANALYTICS METHODS ----------------
+    def _sales_query(self, date_from, date_to, rollup_select, raw_select):
+        """Combine rollup rows for whole days with raw rows for partial-day edges.
+
+        rollup_select reads a rollup table and has a {where} slot for the day
+        filter; raw_select reads orders and ends with a
+        "created_ts >= ? AND created_ts <= ?" condition. Returns (sql, params)
+        for their UNION ALL over the range (all of time if no range is given).
+        """
+        if not (date_from and date_to):
+            return rollup_select.format(where=""), []
+
+        days, edges = _split_date_range(date_from, date_to)
+        parts = []
+        params = []
+        if days:
+            parts.append(rollup_select.format(where="WHERE day BETWEEN ? AND ?"))
+            params.extend(days)
+        for start, end in edges:
+            parts.append(raw_select)
+            params.extend([start, end])
+        return "\nUNION ALL\n".join(parts), params
+
+    def get_kpis(self, date_from: str = None, date_to: str = None):
+        """Return high-level KPIs with optional date range on orders.
+        date_from/date_to format: 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DD' (the whole day).
+        Order figures come from the daily rollups plus any partial-day edges.
 
-        logging.info("Fetched KPIs")
-        return {
+        Results for the last KPI_CACHE_SIZE ranges are kept until an order,
+        employee or settlement changes.
+        """
+        key = (date_from, date_to) if date_from and date_to else (None, None)
+        version = self.change_version(ORDER, EMPLOYEE, SETTLEMENT)
+        cached = self._kpi_cache.get(key)
+        if cached and cached[0] == version:
+            self._kpi_cache.move_to_end(key)
+            return dict(cached[1])
+
+        cursor = self.conn.cursor()
+        if self.analytics_engine is not None:
+            total_orders, total_revenue = self.analytics_engine.order_totals(
+                self.conn, *_epoch_range(date_from, date_to)
+            )
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(amount_due), 0) FROM employees")
+            total_employees, total_due = cursor.fetchone()
+        else:
+            sales, params = self._sales_query(
+                date_from, date_to,
+                "SELECT order_count AS orders, revenue FROM daily_sales {where}",
+                "SELECT COUNT(*) AS orders, COALESCE(SUM(total_order_cost), 0) AS revenue FROM orders WHERE created_ts >= ? AND created_ts <= ?"
+            )
+            cursor.execute(
+                f"""
+                SELECT s.orders, s.revenue, e.employees, e.due
+                FROM (SELECT COALESCE(SUM(orders), 0) AS orders, COALESCE(SUM(revenue), 0) AS revenue
+                      FROM ({sales})) s,
+                     (SELECT COUNT(*) AS employees, COALESCE(SUM(amount_due), 0) AS due
+                      FROM employees) e
+                """,
+                params
+            )
+            total_orders, total_revenue, total_employees, total_due = cursor.fetchone()
+        kpis = {
             "total_orders": total_orders,
-            "total_revenue": total_revenue,
+            "total_revenue": total_revenue or 0.0,
             "total_employees": total_employees,
-            "total_due": total_due,
+            "total_due": total_due or 0.0,
         }
 
+        self._kpi_cache[key] = (version, kpis)
+        self._kpi_cache.move_to_end(key)
+        while len(self._kpi_cache) > KPI_CACHE_SIZE:
+            self._kpi_cache.popitem(last=False)
+        read_log.info("Fetched KPIs")
+        return dict(kpis)
+
     def get_top_items(self, limit=10, date_from: str = None, date_to: str = None):
         """Return top selling items by quantity with optional date range on orders."""
+        if self.analytics_engine is not None:
+            ranked = self.analytics_engine.item_quantities(self.conn, *_epoch_range(date_from, date_to))
+            items = ((self.get_item(item_id), qty) for item_id, qty in ranked)
+            rows = [(item[1], qty) for item, qty in items if item is not None][:limit]
+            read_log.info("Fetched top items (columnar engine)")
+            return rows
+
+        cursor = self.conn.cursor()
+        sales, params = self._sales_query(
+            date_from, date_to,
+            "SELECT item_id, quantity FROM daily_item_sales {where}",
+            """SELECT oi.item_id, oi.quantity
+               FROM orders o
+               JOIN order_items oi ON oi.order_id = o.order_id
+               WHERE o.created_ts >= ? AND o.created_ts <= ?"""
+        )
+        params.append(limit)
+        cursor.execute(
+            f"""
+            SELECT i.item_name, SUM(s.quantity) as total_qty
+            FROM ({sales}) s
+            JOIN items i ON s.item_id = i.item_id
+            GROUP BY s.item_id
+            ORDER BY total_qty DESC
+            LIMIT ?
+            """,
+            params
+        )
+        rows = cursor.fetchall()
+        read_log.info("Fetched top items")
+        return rows
+
+    def get_employee_spend(self, limit=10, date_from: str = None, date_to: str = None):
+        """Return (emp_name, emp_id, total_spent) for the biggest spenders in the date range."""
+        if self.analytics_engine is not None:
+            ranked = self.analytics_engine.employee_spend(self.conn, *_epoch_range(date_from, date_to))
+            spenders = ((self.get_employee(emp_id), spent) for emp_id, spent in ranked)
+            rows = [(emp[2], emp[1], spent) for emp, spent in spenders if emp is not None][:limit]
+            read_log.info("Fetched employee spend (columnar engine)")
+            return rows
+
         cursor = self.conn.cursor()
         where = ""
         params = []
         if date_from and date_to:
-            where = " WHERE o.created_at >= ? AND o.created_at <= ?"
-            params.extend([date_from, date_to])
+            where = "WHERE o.created_ts >= ? AND o.created_ts <= ?"
+            params.extend(_epoch_range(date_from, date_to))
         params.append(limit)
         cursor.execute(
             f"""
-            SELECT i.item_name, SUM(oi.quantity) as total_qty
-            FROM order_items oi
-            JOIN items i ON oi.item_id = i.item_id
-            JOIN orders o ON oi.order_id = o.order_id
+            SELECT e.emp_name, o.emp_id, SUM(o.total_order_cost) AS spent
+            FROM orders o
+            JOIN employees e ON e.emp_id = o.emp_id
             {where}
-            GROUP BY oi.item_id
-            ORDER BY total_qty DESC
+            GROUP BY o.emp_id
+            ORDER BY spent DESC
             LIMIT ?
             """,
             params
         )
         rows = cursor.fetchall()
-        logging.info("Fetched top items")
+        read_log.info("Fetched employee spend")
+        return rows
+
+    def get_hourly_revenue(self, date_from: str = None, date_to: str = None):
+        """Return (hour, order_count, revenue) per local hour that had orders, oldest first.
+        hour is 'YYYY-MM-DD HH:00'. Without a range, all orders with a timestamp count.
+        """
+        if self.analytics_engine is not None:
+            rows = self.analytics_engine.hourly_revenue(self.conn, *_epoch_range(date_from, date_to))
+            if rows is not None:
+                read_log.info("Fetched hourly revenue (columnar engine)")
+                return rows
+
+        cursor = self.conn.cursor()
+        where = "WHERE created_ts IS NOT NULL"
+        params = []
+        if date_from and date_to:
+            where = "WHERE created_ts >= ? AND created_ts <= ?"
+            params = list(_epoch_range(date_from, date_to))
+        cursor.execute(
+            f"""
+            SELECT strftime('%Y-%m-%d %H:00', created_ts, 'unixepoch', 'localtime') AS hour,
+                   COUNT(*), COALESCE(SUM(total_order_cost), 0)
+            FROM orders
+            {where}
+            GROUP BY hour
+            ORDER BY hour
+            """,
+            params
+        )
+        rows = cursor.fetchall()
+        read_log.info("Fetched hourly revenue")
         return rows
 
     def get_top_debtors(self, limit=10):
@@ -303,17 +1233,23 @@ class Database:
             (limit,)
         )
         rows = cursor.fetchall()
-        logging.info("Fetched top debtors")
+        read_log.info("Fetched top debtors")
         return rows
 
-    def get_recent_orders(self, limit=10, date_from: str = None, date_to: str = None):
-        """Return recent orders with optional date range."""
+    def get_recent_orders(self, limit=10, date_from: str = None, date_to: str = None, after_id=None):
+        """Return recent orders with optional date range, newest first.
+        For the next page pass the last order_id returned as after_id.
+        """
         cursor = self.conn.cursor()
-        where = ""
+        conditions = []
         params = []
         if date_from and date_to:
-            where = " WHERE o.created_at >= ? AND o.created_at <= ?"
-            params.extend([date_from, date_to])
+            conditions.append("o.created_ts >= ? AND o.created_ts <= ?")
+            params.extend(_epoch_range(date_from, date_to))
+        if after_id is not None:
+            conditions.append("o.order_id < ?")
+            params.append(after_id)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
         params.append(limit)
         cursor.execute(
             f"""
@@ -327,31 +1263,51 @@ class Database:
             params
         )
         rows = cursor.fetchall()
-        logging.info("Fetched recent orders")
+        read_log.info("Fetched recent orders")
         return rows
 
     def delete_order(self, order_id):
         """Delete an order and adjust employee's due amount."""
-        cursor = self.conn.cursor()
-        
-        # Get order details before deletion
-        cursor.execute("SELECT emp_id, total_order_cost FROM orders WHERE order_id=?", (order_id,))
-        order_data = cursor.fetchone()
-        if not order_data:
-            logging.warning(f"Order {order_id} not found for deletion")
-            return False
-        
-        emp_id, total_cost = order_data
-        
-        # Delete order items first (foreign key constraint)
-        cursor.execute("DELETE FROM order_items WHERE order_id=?", (order_id,))
-        
-        # Delete the order
-        cursor.execute("DELETE FROM orders WHERE order_id=?", (order_id,))
-        
-        # Adjust employee's due amount (subtract the order cost)
-        cursor.execute("UPDATE employees SET amount_due = amount_due - ? WHERE emp_id=?", (total_cost, emp_id))
-        
-        self.conn.commit()
-        logging.info(f"Order {order_id} deleted, adjusted due for emp_id={emp_id} by -{total_cost}")
+        cursor = self._begin_immediate()
+        try:
+            # Get order details before deletion
+            cursor.execute("SELECT emp_id, total_order_cost, created_at FROM orders WHERE order_id=?", (order_id,))
+            order_data = cursor.fetchone()
+            if not order_data:
+                self.conn.rollback()
+                write_log.warning("Order %s not found for deletion", order_id)
+                return False
+
+            emp_id, total_cost, created_at = order_data
+            cursor.execute("""
+                SELECT item_id, SUM(quantity), COALESCE(SUM(quantity * unit_price), 0)
+                FROM order_items
+                WHERE order_id=?
+                GROUP BY item_id
+            """, (order_id,))
+            lines = cursor.fetchall()
+
+            # Delete order items first (foreign key constraint)
+            cursor.execute("DELETE FROM order_items WHERE order_id=?", (order_id,))
+
+            # Delete the order
+            cursor.execute("DELETE FROM orders WHERE order_id=?", (order_id,))
+
+            # Adjust employee's due amount (subtract the order cost)
+            cursor.execute("UPDATE employees SET amount_due = amount_due - ? WHERE emp_id=?", (total_cost, emp_id))
+
+            self._add_to_rollups(
+                cursor, (created_at or "")[:10], -1, -(total_cost or 0),
+                [(item_id, -qty, -revenue) for item_id, qty, revenue in lines]
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.publish(ORDER)
+        write_log.info("Order %s deleted, adjusted due for emp_id=%s by -%s", order_id, emp_id, total_cost)
         return True
+
+
+# OMS_DB_PROFILE=1 times every Database method call; checked once, at import
+profile_from_env(Database)
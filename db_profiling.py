@@ -0,0 +1,251 @@
+"""
+Opt-in timing of Database calls and a slow-query log.
+
+Set OMS_DB_PROFILE=1 to wrap every public Database method. Each call is
+counted and its latency recorded in a fixed-size log-bucket histogram, so
+p50/p95/p99 are available without keeping every sample. A call slower than
+OMS_DB_SLOW_MS milliseconds (default 100) is written to the slow-query log
+(logs/db_slow.log) along with its arguments and every SQL statement it ran,
+with bound values, and the EXPLAIN QUERY PLAN for each. The statements are
+captured with the connection's trace callback. Calls that raise are timed
+too and counted as failed. A per-method summary is logged, and printed, when
+the process exits. db.py checks OMS_DB_PROFILE once, when it is imported.
+
+Profiling is off unless asked for; without it, Database methods are not
+touched at all.
+"""
+
+import atexit
+import contextlib
+import functools
+import inspect
+import logging
+import math
+import os
+import sys
+import threading
+import time
+
+from log_config import SLOW_LOGGER
+
+PROFILE_ENV = "OMS_DB_PROFILE"
+SLOW_MS_ENV = "OMS_DB_SLOW_MS"
+DEFAULT_SLOW_MS = 100
+
+BUCKET_BASE_MS = 0.01   # upper bound of the first histogram bucket
+BUCKET_GROWTH = 1.2     # each bucket is 20% wider than the one before
+BUCKET_COUNT = 100      # up to ~0.01 ms * 1.2**99, about 68 s; slower calls share the last bucket
+
+NOT_PROFILED = {"connect", "explain_query_plan"}  # used by the profiler itself
+
+slow_log = logging.getLogger(SLOW_LOGGER)
+summary_log = logging.getLogger("oms.db.profile")
+
+
+class LatencyHistogram:
+    """Call and failure counts, total time and log-spaced latency buckets for one method."""
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * BUCKET_COUNT
+
+    def add(self, ms, failed=False):
+        self.count += 1
+        self.failed += failed
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        index = 0 if ms <= BUCKET_BASE_MS else math.ceil(math.log(ms / BUCKET_BASE_MS, BUCKET_GROWTH))
+        self.buckets[min(index, BUCKET_COUNT - 1)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound in ms of the bucket holding the given fraction of calls."""
+        target = fraction * self.count
+        seen = 0
+        for index, calls in enumerate(self.buckets):
+            seen += calls
+            if calls and seen >= target:
+                return min(BUCKET_BASE_MS * BUCKET_GROWTH ** index, self.max_ms)
+        return self.max_ms
+
+
+class DatabaseProfiler:
+    """Collects per-method latency and reports slow calls."""
+
+    def __init__(self, slow_ms=DEFAULT_SLOW_MS):
+        self.slow_ms = slow_ms
+        self.stats = {}  # method name -> LatencyHistogram
+        self._lock = threading.Lock()
+        self._local = threading.local()  # per-thread stack of statement lists, one per active call
+
+    # ---------------- Capturing ----------------
+    def trace(self, sql):
+        """Connection trace callback: remember sql for every call in progress on this thread.
+
+        Lines starting with "--" are statements SQLite runs internally, such as
+        FTS5 reading its shadow tables; they are skipped.
+        """
+        if sql.startswith("--"):
+            return
+        for statements in getattr(self._local, "calls", ()):
+            statements.append(sql)
+
+    def attach(self, conn):
+        conn.set_trace_callback(self.trace)
+        return conn
+
+    @contextlib.contextmanager
+    def capture(self):
+        """Collect the statements this thread runs inside the block."""
+        calls = self._local.__dict__.setdefault("calls", [])
+        statements = []
+        calls.append(statements)
+        try:
+            yield statements
+        finally:
+            calls.remove(statements)
+
+    def wrap(self, name, method):
+        @functools.wraps(method)
+        def timed(db, *args, **kwargs):
+            calls = self._local.__dict__.setdefault("calls", [])
+            statements = []
+            calls.append(statements)
+            start = time.perf_counter()
+            error = None
+            try:
+                result = method(db, *args, **kwargs)
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                elapsed = (time.perf_counter() - start) * 1000
+                calls.pop()
+                if error is not None:  # failed or interrupted calls are often the slowest
+                    self.record(name, db, args, elapsed, statements, error)
+            if inspect.isgenerator(result):
+                return self._timed_iteration(name, db, args, result, elapsed)
+            self.record(name, db, args, elapsed, statements)
+            return result
+        return timed
+
+    def _timed_iteration(self, name, db, args, rows, elapsed):
+        """Count time spent producing rows, not time the caller spends using them."""
+        calls = self._local.__dict__.setdefault("calls", [])
+        statements = []
+        error = None
+        try:
+            while True:
+                calls.append(statements)
+                start = time.perf_counter()
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    return
+                except BaseException as exc:
+                    error = exc
+                    raise
+                finally:
+                    elapsed += (time.perf_counter() - start) * 1000
+                    calls.pop()
+                yield row
+        finally:
+            rows.close()
+            self.record(name, db, args, elapsed, statements, error)
+
+    # ---------------- Reporting ----------------
+    def record(self, name, db, args, ms, statements, error=None):
+        with self._lock:
+            self.stats.setdefault(name, LatencyHistogram()).add(ms, failed=error is not None)
+        if ms >= self.slow_ms:
+            self.log_slow_call(name, db, args, ms, statements, error)
+
+    def log_slow_call(self, name, db, args, ms, statements, error=None):
+        lines = [f"{name} took {ms:.1f} ms (threshold {self.slow_ms} ms), args={args!r}"]
+        if error is not None:
+            lines[0] += f", failed with {type(error).__name__}: {error}"
+        calls, self._local.calls = getattr(self._local, "calls", []), []  # keep the EXPLAINs out of outer calls
+        try:
+            for sql in statements:
+                lines.append(f"  SQL: {' '.join(sql.split())}")
+                if not sql.lstrip().upper().startswith(("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")):
+                    continue
+                try:
+                    for step in db.explain_query_plan(sql):
+                        lines.append(f"    PLAN: {step}")
+                except Exception as exc:
+                    lines.append(f"    PLAN unavailable: {exc}")
+        finally:
+            self._local.calls = calls
+        slow_log.warning("\n".join(lines))
+
+    def summary(self):
+        """Return the per-method latency table, slowest total first."""
+        with self._lock:
+            rows = sorted(self.stats.items(), key=lambda item: item[1].total_ms, reverse=True)
+        lines = [f"{'method':<28}{'calls':>8}{'failed':>8}{'total ms':>11}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+        for name, hist in rows:
+            lines.append(
+                f"{name:<28}{hist.count:>8}{hist.failed:>8}{hist.total_ms:>11.1f}{hist.percentile(0.5):>9.2f}"
+                f"{hist.percentile(0.95):>9.2f}{hist.percentile(0.99):>9.2f}{hist.max_ms:>9.2f}"
+            )
+        return "\n".join(lines)
+
+    def dump_summary(self):
+        if not self.stats:
+            return
+        text = self.summary()
+        summary_log.info("Database call profile:\n" + text)
+        print("\nDatabase call profile (ms):\n" + text, file=sys.stderr)
+
+
+_profiler = None
+
+
+def enable_profiling(database_cls, slow_ms=DEFAULT_SLOW_MS):
+    """Wrap the public methods of database_cls once and return the profiler."""
+    global _profiler
+    if _profiler is not None:
+        return _profiler
+    profiler = DatabaseProfiler(slow_ms)
+
+    for name, attr in list(vars(database_cls).items()):
+        if name.startswith("_") or name in NOT_PROFILED or not inspect.isfunction(attr):
+            continue
+        setattr(database_cls, name, profiler.wrap(name, attr))
+
+    connect = database_cls.connect
+    database_cls.connect = functools.wraps(connect)(lambda db: profiler.attach(connect(db)))
+
+    atexit.register(profiler.dump_summary)
+    logging.getLogger("oms.db").info(f"Database profiling enabled, slow threshold {slow_ms} ms")
+    _profiler = profiler
+    return profiler
+
+
+@contextlib.contextmanager
+def capture_statements(conn):
+    """Collect the SQL statements conn runs inside the block.
+
+    With profiling on, the statements come from the profiler so its trace
+    callback stays installed; otherwise one is set just for the block.
+    """
+    if _profiler is not None:
+        with _profiler.capture() as statements:
+            yield statements
+        return
+    statements = []
+    conn.set_trace_callback(lambda sql: sql.startswith("--") or statements.append(sql))
+    try:
+        yield statements
+    finally:
+        conn.set_trace_callback(None)
+
+
+def profile_from_env(database_cls):
+    """Enable profiling if OMS_DB_PROFILE is set; returns the profiler or None."""
+    if os.environ.get(PROFILE_ENV, "").strip().lower() not in ("1", "true", "yes", "on"):
+        return None
+    return enable_profiling(database_cls, float(os.environ.get(SLOW_MS_ENV, DEFAULT_SLOW_MS)))
@@ -0,0 +1,154 @@
+"""
+Background execution of Database calls.
+
+Tabs submit a function that takes a Database and returns a result; it runs on
+a dedicated QThread against that thread's own SQLite connection, and the
+result is handed back to a callback on the GUI thread. Each submission carries
+a key (for example "orders"): submitting again under the same key supersedes
+the previous request, which is skipped if still queued, interrupted if
+running, and never delivered.
+"""
+
+import itertools
+import logging
+import threading
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+log = logging.getLogger("oms.worker")
+
+
+class _Worker(QObject):
+    """Lives on the worker thread and owns the background connection."""
+
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, source_db, is_live):
+        super().__init__()
+        self._source_db = source_db
+        self._is_live = is_live
+        self._db = None
+        self._running = None
+        self._lock = threading.Lock()
+
+    @pyqtSlot(int, object)
+    def run_job(self, job_id, fn):
+        if not self._is_live(job_id):
+            return  # superseded while still queued
+
+        if self._db is None:
+            # sqlite3 connections are bound to the thread that opened them
+            self._db = self._source_db.clone()
+
+        with self._lock:
+            self._running = job_id
+        try:
+            result = fn(self._db)
+        except Exception as exc:
+            if self._is_live(job_id):
+                log.exception(f"Background database job {job_id} failed")
+                self.failed.emit(job_id, str(exc))
+            return
+        finally:
+            with self._lock:
+                self._running = None
+        self.finished.emit(job_id, result)
+
+    def interrupt(self, job_id):
+        """Abort job_id if it is the statement currently executing. Thread-safe."""
+        with self._lock:
+            if self._running == job_id and self._db is not None:
+                self._db.conn.interrupt()
+
+    @pyqtSlot()
+    def close(self):
+        if self._db is not None:
+            self._db.conn.close()
+            self._db = None
+
+
+class DatabaseWorker(QObject):
+    """Runs Database work off the GUI thread and delivers results back to it."""
+
+    _run = pyqtSignal(int, object)
+    _close = pyqtSignal()
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self._ids = itertools.count(1)
+        self._callbacks = {}   # job_id -> (on_result, on_error), GUI thread only
+        self._latest = {}      # key -> live job_id
+        self._live = {}        # live job_id -> key
+        self._lock = threading.Lock()
+
+        self._thread = QThread()
+        self._worker = _Worker(db, self._is_live)
+        self._worker.moveToThread(self._thread)
+        self._run.connect(self._worker.run_job)
+        self._close.connect(self._worker.close)
+        self._worker.finished.connect(self._on_finished)
+        self._worker.failed.connect(self._on_failed)
+        self._thread.start()
+
+    def submit(self, key, fn, on_result, on_error=None):
+        """Run fn(db) in the background and call on_result(result) on the GUI thread.
+
+        Any earlier request still outstanding under the same key is cancelled.
+        on_error(message) is called instead if fn raises.
+        """
+        job_id = next(self._ids)
+        self.cancel(key)
+        with self._lock:
+            self._latest[key] = job_id
+            self._live[job_id] = key
+        self._callbacks[job_id] = (on_result, on_error)
+        self._run.emit(job_id, fn)
+        return job_id
+
+    def cancel(self, key):
+        """Drop the outstanding request for key, interrupting it if it is running."""
+        with self._lock:
+            job_id = self._latest.pop(key, None)
+            self._live.pop(job_id, None)
+        if job_id is not None:
+            self._callbacks.pop(job_id, None)
+            self._worker.interrupt(job_id)
+
+    def shutdown(self):
+        """Cancel everything outstanding and stop the worker thread."""
+        for key in list(self._latest):
+            self.cancel(key)
+        self._close.emit()
+        self._thread.quit()
+        self._thread.wait()
+
+    def _is_live(self, job_id):
+        with self._lock:
+            return job_id in self._live
+
+    def _retire(self, job_id):
+        """Forget job_id; return its callbacks if its result should still be delivered."""
+        callbacks = self._callbacks.pop(job_id, (None, None))
+        with self._lock:
+            key = self._live.pop(job_id, None)
+            if key is None:
+                return None, None
+            del self._latest[key]
+        return callbacks
+
+    @pyqtSlot(int, object)
+    def _on_finished(self, job_id, result):
+        on_result, _ = self._retire(job_id)
+        if on_result is not None:
+            on_result(result)
+
+    @pyqtSlot(int, str)
+    def _on_failed(self, job_id, message):
+        on_result, on_error = self._retire(job_id)
+        if on_result is None:
+            return
+        if on_error is not None:
+            on_error(message)
+        else:
+            log.error(f"Unhandled background database error: {message}")
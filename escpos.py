@@ -0,0 +1,78 @@
+"""
+Plain-text receipts for 80mm ESC/POS thermal printers.
+
+render_receipt_escpos turns a Database.get_order_receipt result into the raw
+bytes such a printer expects: fixed-width 48-column text (Font A on 80mm
+paper) with a handful of ESC/POS control codes for alignment, emphasis, feed
+and cut. There is no layout engine involved, so rendering takes microseconds.
+The ₹ sign is not in the printers' code pages and is printed as "Rs.".
+
+write_receipt_escpos sends those bytes to a device path such as /dev/usb/lp0,
+or to any file or pty standing in for one.
+"""
+
+WIDTH = 48  # characters per line, Font A on 80mm paper
+ENCODING = "cp437"  # the printers' default code page
+
+ESC_INIT = b"\x1b@"
+ESC_ALIGN_LEFT = b"\x1ba\x00"
+ESC_ALIGN_CENTER = b"\x1ba\x01"
+ESC_BOLD_ON = b"\x1bE\x01"
+ESC_BOLD_OFF = b"\x1bE\x00"
+GS_DOUBLE_SIZE = b"\x1d!\x11"
+GS_NORMAL_SIZE = b"\x1d!\x00"
+ESC_FEED_4 = b"\x1bd\x04"
+GS_PARTIAL_CUT = b"\x1dV\x01"
+
+NAME_WIDTH = 24
+RULE = "-" * WIDTH
+DOUBLE_RULE = "=" * WIDTH
+COLUMN_HEADER = f"{'Item':<{NAME_WIDTH}}{'Qty':>5}{'Price':>9}{'Total':>10}"
+
+
+def _encode(text):
+    return text.encode(ENCODING, errors="replace")
+
+
+def _line_rows(name, qty, price, line_total):
+    """One row per line item; names longer than NAME_WIDTH continue below."""
+    rows = [f"{name[:NAME_WIDTH]:<{NAME_WIDTH}}{qty:>5}{price:>9.2f}{line_total:>10.2f}"]
+    for start in range(NAME_WIDTH, len(name), NAME_WIDTH - 2):
+        rows.append(f"  {name[start:start + NAME_WIDTH - 2]}")
+    return rows
+
+
+def render_receipt_escpos(receipt):
+    """Return the ESC/POS bytes for a Database.get_order_receipt result."""
+    employee = f"{receipt['emp_id'] or ''} - {receipt['emp_name'] or ''}"
+    body = [
+        RULE,
+        f"Order ID: #{receipt['order_id']}",
+        f"Employee: {employee}"[:WIDTH],
+        f"Date: {receipt['created_at'] or ''}",
+        RULE,
+        COLUMN_HEADER,
+        RULE,
+    ]
+    for line in receipt["lines"]:
+        body.extend(_line_rows(str(line[0]), *line[1:]))
+    body.append(DOUBLE_RULE)
+
+    total = f"Rs. {receipt['total']:.2f}"
+    return b"".join([
+        ESC_INIT,
+        ESC_ALIGN_CENTER, ESC_BOLD_ON, GS_DOUBLE_SIZE, b"CAFETERIA RECEIPT\n",
+        GS_NORMAL_SIZE, ESC_BOLD_OFF, b"Order Management System\n",
+        ESC_ALIGN_LEFT, _encode("\n".join(body)), b"\n",
+        ESC_BOLD_ON, _encode(f"{'TOTAL':<{WIDTH - len(total)}}{total}"), b"\n", ESC_BOLD_OFF,
+        ESC_ALIGN_CENTER, b"\nThank you for your order!\n",
+        ESC_FEED_4, GS_PARTIAL_CUT,
+    ])
+
+
+def write_receipt_escpos(receipt, device):
+    """Render receipt and write it to device (a printer device path, file or pty)."""
+    data = render_receipt_escpos(receipt)
+    with open(device, "ab", buffering=0) as out:
+        out.write(data)
+    return len(data)
@@ -9,11 +9,12 @@ import os
 import csv
 import openpyxl
 from db import Database
+from log_config import configure_logging
 
 def import_employees_from_csv(db, file_path):
     """Import employees from CSV file."""
     print(f"Importing employees from {file_path}...")
-    imported_count = 0
+    rows = []
     
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
@@ -21,50 +22,47 @@ def import_employees_from_csv(db, file_path):
             header = next(reader)  # Skip header row
             
             for row in reader:
-                if len(row) >= 2:
-                    emp_id = row[0].strip()
-                    emp_name = row[1].strip()
-                    
-                    if emp_id and emp_name:
-                        try:
-                            db.add_employee(emp_id, emp_name)
-                            imported_count += 1
-                            print(f"  ✓ Added employee: {emp_id} - {emp_name}")
-                        except Exception as e:
-                            print(f"  ✗ Failed to add employee {emp_id}: {e}")
+                if row:
+                    rows.append(row[:2])
                             
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         
-    print(f"Imported {imported_count} employees from CSV")
-    return imported_count
+    return _add_employees(db, rows, "CSV")
 
 def import_employees_from_excel(db, file_path):
     """Import employees from Excel file."""
     print(f"Importing employees from {file_path}...")
-    imported_count = 0
+    rows = []
     
     try:
         workbook = openpyxl.load_workbook(file_path)
         sheet = workbook.active
         
         for row in sheet.iter_rows(min_row=2, values_only=True):  # Skip header
-            if row[0] and row[1]:
-                emp_id = str(row[0]).strip()
-                emp_name = str(row[1]).strip()
-                
-                try:
-                    db.add_employee(emp_id, emp_name)
-                    imported_count += 1
-                    print(f"  ✓ Added employee: {emp_id} - {emp_name}")
-                except Exception as e:
-                    print(f"  ✗ Failed to add employee {emp_id}: {e}")
+            if row and (row[0] is not None or row[1] is not None):
+                rows.append(row[:2])
                     
     except Exception as e:
         print(f"Error reading Excel file: {e}")
         
-    print(f"Imported {imported_count} employees from Excel")
-    return imported_count
+    return _add_employees(db, rows, "Excel")
+
+def _add_employees(db, rows, source):
+    """Insert parsed employee rows in one transaction and report the outcome."""
+    try:
+        result = db.add_employees_bulk(rows)
+    except Exception as e:
+        print(f"  ✗ Failed to add employees: {e}")
+        return 0
+
+    print(f"  ✓ Added {result['inserted']} employee(s)")
+    if result['duplicates']:
+        print(f"  • Skipped {result['duplicates']} duplicate employee ID(s)")
+    if result['invalid']:
+        print(f"  ✗ Skipped {result['invalid']} row(s) missing an ID or name")
+    print(f"Imported {result['inserted']} employees from {source}")
+    return result['inserted']
 
 def import_items_from_csv(db, file_path):
     """Import items from CSV file."""
@@ -125,6 +123,7 @@ def import_items_from_excel(db, file_path):
 
 def main():
     """Main function to import all sample data."""
+    configure_logging()
     print("=" * 60)
     print("ORDER MANAGEMENT SYSTEM - SAMPLE DATA IMPORT")
     print("=" * 60)
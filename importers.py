@@ -0,0 +1,151 @@
+"""
+Streaming CSV/Excel import for employees and menu items.
+
+Files are read row by row (CSV through a byte-counting reader, Excel through
+openpyxl's read-only mode) and written in fixed-size chunks, each committed
+with one bulk insert, so memory use does not grow with file size. ImportWorker
+runs an import on its own thread and connection and reports progress.
+"""
+
+import csv
+import logging
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+log = logging.getLogger("oms.import")
+
+CHUNK_SIZE = 1000  # rows per bulk insert / commit
+
+
+def iter_csv_rows(file_path):
+    """Yield (cells, fraction_read) for each row of a UTF-8 CSV file."""
+    with open(file_path, "rb") as raw:
+        size = max(raw.seek(0, 2), 1)
+        raw.seek(0)
+        lines = (line.decode("utf-8-sig") for line in raw)
+        for row in csv.reader(lines):
+            yield row, raw.tell() / size
+
+
+def iter_excel_rows(file_path):
+    """Yield (values, fraction_read) for each row of the active sheet of a workbook."""
+    try:
+        import openpyxl  # type: ignore
+    except Exception:
+        raise RuntimeError("openpyxl is required for Excel import. Please install it.")
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = wb.active
+        total = sheet.max_row or 0  # unknown when the file has no dimension record
+        for row_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            yield row, (min(row_idx / total, 1.0) if total else 0.0)
+    finally:
+        wb.close()
+
+
+def _first_two(values):
+    values = list(values or ())[:2]
+    values += [None] * (2 - len(values))
+    return [v.strip() if isinstance(v, str) else v for v in values]
+
+
+def parse_employee_row(values, is_first):
+    """Return (emp_id, name) for a data row, or None for a blank or header row."""
+    emp_id, name = _first_two(values)
+    if emp_id in (None, "") and name in (None, ""):
+        return None
+    if is_first and isinstance(emp_id, str) and isinstance(name, (str, type(None))):
+        header = f"{emp_id.lower()} {(name or '').lower()}"
+        if ("employee" in header or "emp" in header) and ("name" in header or "id" in header):
+            return None
+    return emp_id, name
+
+
+def parse_item_row(values, is_first):
+    """Return (name, price) for a data row, or None for a blank or header row.
+
+    Prices may carry a ₹ sign; anything that is still not a number is passed
+    through so the bulk insert counts it as invalid.
+    """
+    name, price = _first_two(values)
+    if name in (None, "") and price in (None, ""):
+        return None
+    if is_first and isinstance(name, str) and isinstance(price, (str, type(None))):
+        header = f"{name.lower()} {(price or '').lower()}"
+        if "name" in header and ("price" in header or "cost" in header):
+            return None
+    if isinstance(price, str):
+        price = price.replace("₹", "").strip()
+    return name, price
+
+
+IMPORT_KINDS = {
+    # kind: (row parser, Database bulk insert method)
+    "employees": (parse_employee_row, "add_employees_bulk"),
+    "items": (parse_item_row, "add_items_bulk"),
+}
+
+
+class ImportWorker(QThread):
+    """Imports a CSV or Excel file in the background.
+
+    progress carries the percentage of the file read so far. completed carries
+    the summed bulk insert counts plus "cancelled", which is True when
+    requestInterruption() stopped the import early; chunks written before
+    that point stay committed.
+    """
+
+    progress = pyqtSignal(int)
+    completed = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db, kind, file_path, parent=None):
+        super().__init__(parent)
+        self.source_db = db
+        self.parse_row, self.bulk_method = IMPORT_KINDS[kind]
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            self.completed.emit(self._import())
+        except Exception as exc:
+            log.exception(f"Import of {self.file_path} failed")
+            self.failed.emit(str(exc))
+
+    def _import(self):
+        if self.file_path.lower().endswith(".csv"):
+            rows = iter_csv_rows(self.file_path)
+        else:
+            rows = iter_excel_rows(self.file_path)
+
+        db = self.source_db.clone()  # connections are bound to their thread
+        bulk_insert = getattr(db, self.bulk_method)
+        totals = {"cancelled": False}
+        chunk = []
+        percent = -1
+
+        def flush():
+            for key, count in bulk_insert(chunk).items():
+                totals[key] = totals.get(key, 0) + count
+            chunk.clear()
+
+        try:
+            for row_idx, (values, fraction) in enumerate(rows):
+                if self.isInterruptionRequested():
+                    totals["cancelled"] = True
+                    break
+                parsed = self.parse_row(values, row_idx == 0)
+                if parsed is not None:
+                    chunk.append(parsed)
+                if len(chunk) >= CHUNK_SIZE:
+                    flush()
+                if int(fraction * 100) != percent:
+                    percent = int(fraction * 100)
+                    self.progress.emit(percent)
+            if chunk and not totals["cancelled"]:
+                flush()
+        finally:
+            rows.close()
+            db.conn.close()
+        return totals
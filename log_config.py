@@ -0,0 +1,125 @@
+"""
+Logging setup for the application and its scripts.
+
+configure_logging() sends every record through a QueueHandler. A
+QueueListener thread formats the records and writes them to a size-rotated
+file in logs/, so a log call on the order-placement or autocomplete path
+only puts a record on an in-memory queue.
+
+Database logs under two categories with their own levels: "oms.db.read" for
+queries and "oms.db.write" for changes. Reads happen on every keystroke, so
+they can also be sampled. Environment variables:
+
+    OMS_LOG_LEVEL         level for everything else (default INFO)
+    OMS_LOG_READ_LEVEL    level for oms.db.read (default INFO)
+    OMS_LOG_WRITE_LEVEL   level for oms.db.write (default INFO)
+    OMS_LOG_READ_SAMPLE   fraction of read records kept, 0..1 (default 1)
+    OMS_LOG_MAX_BYTES     size at which the log file rotates (default 5 MB)
+    OMS_LOG_BACKUPS       rotated files kept (default 5)
+
+The other modules log under their own names (oms.analytics, oms.worker,
+oms.print, oms.export, oms.import), which follow OMS_LOG_LEVEL and can be
+tuned with logging.getLogger(name).setLevel(). Slow calls reported by
+db_profiling go to logs/db_slow.log instead.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+READ_LOGGER = "oms.db.read"
+WRITE_LOGGER = "oms.db.write"
+SLOW_LOGGER = "oms.db.slow"  # slow-query log from db_profiling, written to its own file
+SLOW_LOG_FILE = "db_slow.log"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_listener = None
+_handler = None
+
+
+class SampleFilter(logging.Filter):
+    """Keeps about rate of the records it sees; warnings and above always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def _env_level(name, default="INFO"):
+    value = os.environ.get(name, default).strip().upper()
+    level = logging.getLevelName(value)
+    if not isinstance(level, int):
+        raise ValueError(f"Invalid log level for {name}: {value!r}")
+    return level
+
+
+def _rotating_handler(path):
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=int(os.environ.get("OMS_LOG_MAX_BYTES", 5 * 1024 * 1024)),
+        backupCount=int(os.environ.get("OMS_LOG_BACKUPS", 5)),
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def log_dir():
+    """logs/ next to the executable or the scripts, like the data/ directory."""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, "logs")
+
+
+def configure_logging(filename=None):
+    """Start the background log writer once per process; later calls do nothing.
+
+    Returns the path of the log file.
+    """
+    global _listener, _handler
+    directory = log_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename or f"db_{datetime.now().strftime('%Y-%m-%d')}.log")
+    if _listener is not None:
+        return path
+
+    file_handler = _rotating_handler(path)
+    file_handler.addFilter(lambda record: not record.name.startswith(SLOW_LOGGER))
+    slow_handler = _rotating_handler(os.path.join(directory, SLOW_LOG_FILE))
+    slow_handler.addFilter(logging.Filter(SLOW_LOGGER))
+
+    records = queue.SimpleQueue()
+    _handler = QueueHandler(records)
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(_env_level("OMS_LOG_LEVEL"))
+
+    logging.getLogger(READ_LOGGER).setLevel(_env_level("OMS_LOG_READ_LEVEL"))
+    logging.getLogger(WRITE_LOGGER).setLevel(_env_level("OMS_LOG_WRITE_LEVEL"))
+    sample = float(os.environ.get("OMS_LOG_READ_SAMPLE", 1))
+    if sample < 1:
+        logging.getLogger(READ_LOGGER).addFilter(SampleFilter(sample))
+
+    _listener = QueueListener(records, file_handler, slow_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return path
+
+
+def shutdown_logging():
+    """Write out queued records and stop the background writer."""
+    global _listener, _handler
+    if _listener is not None:
+        logging.getLogger().removeHandler(_handler)
+        _listener.stop()
+        _listener = _handler = None
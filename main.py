@@ -1,8 +1,12 @@
+import multiprocessing
 import sys
 from PyQt5.QtWidgets import QApplication, QMainWindow, QTabWidget, QShortcut, QMessageBox
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QKeySequence
 from db import Database
+from log_config import configure_logging
+from db_worker import DatabaseWorker
+from print_spooler import PrintSpooler
 
 from Tabs.PlaceOrder import PlaceOrderTab
 from Tabs.Orders import OrdersTab
@@ -77,17 +81,20 @@ class MainWindow(QMainWindow):
         """)
 
         self.db = Database()  # Shared DB instance
+        self.db_worker = DatabaseWorker(self.db)  # Background reads for heavy tabs
+        self.print_spooler = PrintSpooler(self.db)  # Background receipt printing
+        self.print_spooler.start()
 
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
 
         # --- Initialize Tabs ---
-        self.place_order_tab = PlaceOrderTab(self.db)
-        self.orders_tab = OrdersTab(self.db)
+        self.place_order_tab = PlaceOrderTab(self.db, self.print_spooler)
+        self.orders_tab = OrdersTab(self.db, self.db_worker, self.print_spooler)
         self.menu_tab = MenuMakerTab(self.db)
         self.settle_tab = SettleUpTab(self.db)
-        self.employee_tab = AddEmployeesTab(self.db)
-        self.analytics_tab = AnalyticsTab(self.db)
+        self.employee_tab = AddEmployeesTab(self.db, self.db_worker)
+        self.analytics_tab = AnalyticsTab(self.db, self.db_worker)
 
         self.tabs.addTab(self.place_order_tab, "🛒 Place Order")
         self.tabs.addTab(self.orders_tab, "📦 Orders")
@@ -102,6 +109,12 @@ class MainWindow(QMainWindow):
         # --- Setup Shortcuts ---
         self.setup_shortcuts()
 
+    def closeEvent(self, event):
+        """Stop the background threads before the window goes away."""
+        self.db_worker.shutdown()
+        self.print_spooler.stop()
+        super().closeEvent(event)
+
     def on_tab_changed(self, index):
         current_widget = self.tabs.widget(index)
         # Call refresh if the tab has a refresh method
@@ -141,7 +154,7 @@ class MainWindow(QMainWindow):
         """Refresh the currently active tab."""
         current_widget = self.tabs.currentWidget()
         if hasattr(current_widget, "refresh"):
-            current_widget.refresh()
+            current_widget.refresh(force=True)
 
     def show_help(self):
         """Show keyboard shortcuts help dialog."""
@@ -171,6 +184,8 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "Keyboard Shortcuts", help_text)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # batch export worker processes in the packaged build
+    configure_logging()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
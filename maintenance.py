@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the Order Management System database.
+
+Usage:
+    python3 maintenance.py rebuild-rollups [--db orders.db]
+"""
+
+import argparse
+import time
+from db import Database
+from log_config import configure_logging
+
+def rebuild_rollups(db):
+    """Regenerate the daily sales rollups used by Analytics from the order tables."""
+    print("\n📊 REBUILDING SALES ROLLUPS")
+    print("-" * 40)
+    start = time.perf_counter()
+    days = db.rebuild_sales_rollups()
+    print(f"✓ Rebuilt rollups for {days} day(s) in {time.perf_counter() - start:.2f} s")
+
+COMMANDS = {
+    "rebuild-rollups": rebuild_rollups,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Database maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS), help="what to run")
+    parser.add_argument("--db", default="orders.db", help="database file name in the data directory")
+    args = parser.parse_args()
+    configure_logging()
+
+    print("=" * 60)
+    print("ORDER MANAGEMENT SYSTEM - DATABASE MAINTENANCE")
+    print("=" * 60)
+
+    db = Database(args.db)
+    try:
+        COMMANDS[args.command](db)
+    finally:
+        db.conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Background print queue for receipts.
+
+Placing an order only enqueues its receipt; PrintSpooler fetches, renders and
+prints receipts on its own thread and connection, strictly in the order they
+were queued, so the cashier never waits on the printer. A receipt that fails
+to print is retried a few times with a growing delay, and if it still fails
+it is kept aside until retry_failed() queues it again. status_changed reports
+the queue state after every step so a tab can show it.
+
+OMS_RECEIPT_MODE picks how receipts are printed: "html" (default) lays them
+out on the system default printer, "escpos" writes raw ESC/POS text to the
+thermal printer device named by OMS_RECEIPT_DEVICE (a file or pty works too).
+"""
+
+import functools
+import logging
+import os
+import queue
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QTextDocument
+from PyQt5.QtPrintSupport import QPrinter, QPrinterInfo
+
+from escpos import write_receipt_escpos
+from receipts import render_receipt_html
+
+log = logging.getLogger("oms.print")
+
+RECEIPT_MODE_ENV = "OMS_RECEIPT_MODE"
+RECEIPT_DEVICE_ENV = "OMS_RECEIPT_DEVICE"
+MAX_ATTEMPTS = 3       # tries per receipt before it is set aside as failed
+RETRY_DELAY_S = 2.0    # wait before the first retry; doubles on each retry
+
+
+def default_printer():
+    """Return a QPrinter for the system default printer, or raise if there is none."""
+    if not QPrinterInfo.availablePrinters():
+        raise RuntimeError("No printer available")
+    printer = QPrinter()
+    printer.setPageSize(QPrinter.A4)
+    printer.setOrientation(QPrinter.Portrait)
+    return printer
+
+
+def print_receipt_html(receipt, printer_factory=default_printer):
+    """Render receipt as HTML and print it on a printer from printer_factory()."""
+    printer = printer_factory()
+    doc = QTextDocument()
+    doc.setHtml(render_receipt_html(receipt))
+    doc.print_(printer)
+
+
+def output_from_env():
+    """Return the receipt output selected by OMS_RECEIPT_MODE / OMS_RECEIPT_DEVICE."""
+    mode = os.environ.get(RECEIPT_MODE_ENV, "html").strip().lower()
+    if mode == "escpos":
+        device = os.environ.get(RECEIPT_DEVICE_ENV, "").strip()
+        if device:
+            return functools.partial(write_receipt_escpos, device=device)
+        log.warning(f"{RECEIPT_MODE_ENV}=escpos but {RECEIPT_DEVICE_ENV} is not set; printing HTML receipts")
+    elif mode != "html":
+        log.warning(f"Unknown {RECEIPT_MODE_ENV}={mode!r}; printing HTML receipts")
+    return print_receipt_html
+
+
+class PrintSpooler(QThread):
+    """Prints queued order receipts one at a time in the background.
+
+    output(receipt) does the printing for one Database.get_order_receipt
+    result and raises on failure; it runs on the spooler thread. The default
+    comes from output_from_env().
+
+    status_changed carries (queued, failed, message): receipts still waiting
+    or printing, receipts set aside after MAX_ATTEMPTS, and a short line
+    describing the latest step.
+    """
+
+    status_changed = pyqtSignal(int, int, str)
+
+    def __init__(self, db, output=None, parent=None):
+        super().__init__(parent)
+        self.source_db = db
+        self.output = output or output_from_env()
+        self._queue = queue.Queue()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._failed = []  # order_ids set aside after MAX_ATTEMPTS
+
+    def enqueue(self, order_id):
+        """Queue the receipt for order_id; returns immediately."""
+        with self._lock:
+            self._queued += 1
+        self._queue.put(order_id)
+        self._report(f"Queued receipt for Order #{order_id}")
+
+    def retry_failed(self):
+        """Queue every receipt that ran out of attempts again."""
+        with self._lock:
+            failed, self._failed = self._failed, []
+        for order_id in failed:
+            self.enqueue(order_id)
+
+    def counts(self):
+        """Return (queued, failed)."""
+        with self._lock:
+            return self._queued, len(self._failed)
+
+    def stop(self):
+        """Finish the receipt being printed, drop the rest and wait for the thread."""
+        self._stopping.set()
+        self._queue.put(None)
+        self.wait()
+
+    def run(self):
+        db = self.source_db.clone()  # connections are bound to their thread
+        try:
+            while not self._stopping.is_set():
+                order_id = self._queue.get()
+                if order_id is None:
+                    break
+                self._print(db, order_id)
+        finally:
+            db.conn.close()
+
+    def _print(self, db, order_id):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self._report(f"Printing receipt for Order #{order_id}")
+            try:
+                receipt = db.get_order_receipt(order_id)
+                if receipt is None:
+                    log.error(f"Receipt for order {order_id} skipped: order not found")
+                    self._done(order_id, f"Skipped Order #{order_id}: order not found")
+                    return
+                self.output(receipt)
+            except Exception as e:
+                log.error(f"Print attempt {attempt}/{MAX_ATTEMPTS} failed for order {order_id}: {str(e)}")
+                if attempt == MAX_ATTEMPTS:
+                    self._done(order_id, f"Failed to print Order #{order_id}: {str(e)}", failed=True)
+                    return
+                delay = RETRY_DELAY_S * 2 ** (attempt - 1)
+                self._report(f"Retrying Order #{order_id} in {delay:.0f}s ({str(e)})")
+                if self._stopping.wait(delay):
+                    return
+            else:
+                log.info(f"Printed receipt for order_id={order_id}")
+                self._done(order_id, f"Printed receipt for Order #{order_id}")
+                return
+
+    def _done(self, order_id, message, failed=False):
+        with self._lock:
+            self._queued -= 1
+            if failed:
+                self._failed.append(order_id)
+        self._report(message)
+
+    def _report(self, message):
+        queued, failed = self.counts()
+        self.status_changed.emit(queued, failed, message)
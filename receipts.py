@@ -0,0 +1,343 @@
+"""
+Order receipts: rendering, preview, printing and PDF export.
+
+A receipt is built from Database.get_order_receipt, which returns the order,
+the employee and every priced line in one query. The HTML comes from
+string.Template objects compiled once at import, and the line rows are joined
+in a single pass. Dues statements for batch export share the page layout.
+
+ReceiptService is shared by the Place Order tab (right after an order is
+placed) and the Orders tab (reprinting any past order). With a PrintSpooler
+attached, printing goes through its background queue instead of the modal
+print dialog.
+"""
+
+import html
+import logging
+from datetime import datetime
+from string import Template
+
+from PyQt5.QtGui import QTextDocument
+from PyQt5.QtPrintSupport import QPrinter, QPrintDialog, QPrinterInfo
+from PyQt5.QtWidgets import (
+    QApplication, QDialog, QDialogButtonBox, QFileDialog, QMessageBox, QTextEdit, QVBoxLayout
+)
+
+log = logging.getLogger("oms.print")
+
+PAGE_TEMPLATE = Template("""
+<html>
+<head>
+    <style>
+        body { font-family: 'Courier New', monospace; margin: 20px; }
+        .header { text-align: center; border-bottom: 2px solid #000; padding-bottom: 10px; margin-bottom: 20px; }
+        .title { font-size: 24px; font-weight: bold; margin-bottom: 5px; }
+        .subtitle { font-size: 14px; color: #666; }
+        .order-info { margin-bottom: 20px; }
+        .items-table { width: 100%; border-collapse: collapse; margin-bottom: 20px; }
+        .items-table th, .items-table td { border: 1px solid #000; padding: 8px; text-align: left; }
+        .items-table th { background-color: #f0f0f0; font-weight: bold; }
+        .total { font-size: 18px; font-weight: bold; text-align: right; border-top: 2px solid #000; padding-top: 10px; }
+        .footer { text-align: center; margin-top: 30px; font-size: 12px; color: #666; }
+    </style>
+</head>
+<body>
+$body
+</body>
+</html>
+""")
+
+PAGE_BREAK = '\n<div style="page-break-before: always"></div>\n'
+
+RECEIPT_TEMPLATE = Template("""
+    <div class="header">
+        <div class="title">CAFETERIA RECEIPT</div>
+        <div class="subtitle">Order Management System</div>
+    </div>
+
+    <div class="order-info">
+        <p><strong>Order ID:</strong> #$order_id</p>
+        <p><strong>Employee ID:</strong> $emp_id</p>
+        <p><strong>Employee Name:</strong> $emp_name</p>
+        <p><strong>Date & Time:</strong> $created_at</p>
+    </div>
+
+    <table class="items-table">
+        <thead>
+            <tr>
+                <th>Item</th>
+                <th>Qty</th>
+                <th>Price</th>
+                <th>Total</th>
+            </tr>
+        </thead>
+        <tbody>
+$lines
+        </tbody>
+    </table>
+
+    <div class="total">
+        <p>Total Amount: ₹$total</p>
+    </div>
+
+    <div class="footer">
+        <p>Thank you for your order!</p>
+        <p>Generated by Order Management System</p>
+    </div>
+""")
+
+LINE_TEMPLATE = Template(
+    "            <tr><td>$name</td><td>$qty</td><td>₹$price</td><td>₹$line_total</td></tr>"
+)
+
+STATEMENT_TEMPLATE = Template("""
+    <div class="header">
+        <div class="title">DUES STATEMENT</div>
+        <div class="subtitle">Order Management System</div>
+    </div>
+
+    <div class="order-info">
+        <p><strong>Employee ID:</strong> $emp_id</p>
+        <p><strong>Employee Name:</strong> $emp_name</p>
+        <p><strong>Period:</strong> $period</p>
+    </div>
+
+    <table class="items-table">
+        <thead>
+            <tr>
+                <th>Order ID</th>
+                <th>Date & Time</th>
+                <th>Total</th>
+            </tr>
+        </thead>
+        <tbody>
+$orders
+        </tbody>
+    </table>
+
+    <div class="total">
+        <p>Spent in Period: ₹$spent</p>
+        <p>Amount Due: ₹$amount_due</p>
+    </div>
+
+    <div class="footer">
+        <p>Generated by Order Management System on $generated_at</p>
+    </div>
+""")
+
+STATEMENT_ORDER_TEMPLATE = Template(
+    "            <tr><td>#$order_id</td><td>$created_at</td><td>₹$total</td></tr>"
+)
+
+
+def receipt_body(receipt):
+    """Return the page body for a Database.get_order_receipt result."""
+    lines = "\n".join(
+        LINE_TEMPLATE.substitute(
+            name=html.escape(str(name)), qty=qty, price=f"{price:.2f}", line_total=f"{line_total:.2f}"
+        )
+        for name, qty, price, line_total in receipt["lines"]
+    )
+    return RECEIPT_TEMPLATE.substitute(
+        order_id=receipt["order_id"],
+        emp_id=html.escape(str(receipt["emp_id"] or "")),
+        emp_name=html.escape(str(receipt["emp_name"] or "")),
+        created_at=html.escape(receipt["created_at"] or datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        lines=lines,
+        total=f"{receipt['total']:.2f}",
+    )
+
+
+def statement_body(statement, period="All time"):
+    """Return the page body for a Database.iter_employee_statements result."""
+    orders = "\n".join(
+        STATEMENT_ORDER_TEMPLATE.substitute(
+            order_id=order_id, created_at=html.escape(created_at or ""), total=f"{total:.2f}"
+        )
+        for order_id, created_at, total in statement["orders"]
+    )
+    return STATEMENT_TEMPLATE.substitute(
+        emp_id=html.escape(str(statement["emp_id"])),
+        emp_name=html.escape(str(statement["emp_name"])),
+        period=html.escape(period),
+        orders=orders,
+        spent=f"{statement['spent']:.2f}",
+        amount_due=f"{statement['amount_due']:.2f}",
+        generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def render_pages_html(bodies):
+    """Return one HTML document with each body on its own page."""
+    return PAGE_TEMPLATE.substitute(body=PAGE_BREAK.join(bodies))
+
+
+def render_receipt_html(receipt):
+    """Return the receipt HTML for a Database.get_order_receipt result."""
+    return PAGE_TEMPLATE.substitute(body=receipt_body(receipt))
+
+
+class ReceiptService:
+    """Builds receipts for orders and shows, prints or saves them for a widget."""
+
+    def __init__(self, db, parent, spooler=None):
+        self.db = db
+        self.parent = parent
+        self.spooler = spooler
+
+    def receipt_html(self, order_id):
+        """Return the receipt HTML for order_id, or None if the order does not exist."""
+        receipt = self.db.get_order_receipt(order_id)
+        return render_receipt_html(receipt) if receipt else None
+
+    def show(self, order_id):
+        """Open the receipt preview for order_id, reporting any failure in a dialog."""
+        try:
+            receipt_html = self.receipt_html(order_id)
+            if receipt_html is None:
+                QMessageBox.warning(self.parent, "Receipt", f"Order #{order_id} was not found.")
+                return
+            self.show_preview(receipt_html, order_id)
+        except Exception as e:
+            log.error(f"Receipt generation failed: {str(e)}")
+            QMessageBox.critical(
+                self.parent,
+                "Receipt Generation Failed",
+                f"Unable to generate receipt for Order #{order_id}.\n\n"
+                f"Error: {str(e)}\n\n"
+                f"The order itself is saved; you can reprint it from the Orders tab."
+            )
+
+    def show_preview(self, receipt_html, order_id):
+        """Show the receipt preview dialog with print, PDF and copy options."""
+        dialog = QDialog(self.parent)
+        dialog.setWindowTitle(f"Receipt Preview - Order #{order_id}")
+        dialog.setModal(True)
+        dialog.resize(600, 700)
+
+        layout = QVBoxLayout()
+
+        preview = QTextEdit()
+        preview.setHtml(receipt_html)
+        preview.setReadOnly(True)
+        layout.addWidget(preview)
+
+        button_box = QDialogButtonBox()
+        print_btn = button_box.addButton("🖨️ Print", QDialogButtonBox.ActionRole)
+        save_btn = button_box.addButton("💾 Save as PDF", QDialogButtonBox.ActionRole)
+        copy_btn = button_box.addButton("📋 Copy Text", QDialogButtonBox.ActionRole)
+        close_btn = button_box.addButton("Close", QDialogButtonBox.RejectRole)
+
+        if self.spooler is not None:
+            print_btn.clicked.connect(lambda: (self.spooler.enqueue(order_id), dialog.accept()))
+        else:
+            print_btn.clicked.connect(lambda: self.print_html(receipt_html, order_id))
+        save_btn.clicked.connect(lambda: self.save_pdf(receipt_html, order_id))
+        copy_btn.clicked.connect(lambda: self.copy_text(receipt_html, order_id))
+        close_btn.clicked.connect(dialog.accept)
+
+        layout.addWidget(button_box)
+        dialog.setLayout(layout)
+        dialog.exec_()
+
+    def print_html(self, receipt_html, order_id):
+        """Send the receipt to a printer chosen in the print dialog."""
+        try:
+            if not QPrinterInfo.availablePrinters():
+                QMessageBox.warning(
+                    self.parent,
+                    "No Printer Available",
+                    "No printers are available on this system.\n\n"
+                    "Please connect a printer or use 'Save as PDF' option instead."
+                )
+                return
+
+            printer = QPrinter()
+            printer.setPageSize(QPrinter.A4)
+            printer.setOrientation(QPrinter.Portrait)
+
+            print_dialog = QPrintDialog(printer, self.parent)
+            print_dialog.setWindowTitle(f"Print Receipt - Order #{order_id}")
+            if print_dialog.exec_() == QPrintDialog.Accepted:
+                doc = QTextDocument()
+                doc.setHtml(receipt_html)
+                doc.print_(printer)
+                QMessageBox.information(
+                    self.parent,
+                    "Print Successful",
+                    f"Receipt for Order #{order_id} has been sent to printer successfully!"
+                )
+
+        except Exception as e:
+            log.error(f"Print failed for order {order_id}: {str(e)}")
+            QMessageBox.critical(
+                self.parent,
+                "Print Failed",
+                f"Failed to print receipt for Order #{order_id}.\n\n"
+                f"Error: {str(e)}\n\n"
+                f"Possible solutions:\n"
+                f"• Check if printer is connected and turned on\n"
+                f"• Try using 'Save as PDF' option instead\n"
+                f"• Restart the application and try again"
+            )
+
+    def save_pdf(self, receipt_html, order_id):
+        """Save the receipt as a PDF file chosen by the user."""
+        try:
+            filename = f"Receipt_Order_{order_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            file_path, _ = QFileDialog.getSaveFileName(
+                self.parent,
+                "Save Receipt as PDF",
+                filename,
+                "PDF Files (*.pdf);;All Files (*)"
+            )
+            if not file_path:
+                return
+
+            printer = QPrinter(QPrinter.HighResolution)
+            printer.setOutputFormat(QPrinter.PdfFormat)
+            printer.setOutputFileName(file_path)
+            printer.setPageSize(QPrinter.A4)
+            printer.setOrientation(QPrinter.Portrait)
+
+            doc = QTextDocument()
+            doc.setHtml(receipt_html)
+            doc.print_(printer)
+
+            QMessageBox.information(
+                self.parent,
+                "PDF Saved Successfully",
+                f"Receipt for Order #{order_id} has been saved as PDF:\n\n{file_path}"
+            )
+
+        except Exception as e:
+            log.error(f"PDF save failed for order {order_id}: {str(e)}")
+            QMessageBox.critical(
+                self.parent,
+                "PDF Save Failed",
+                f"Failed to save receipt as PDF for Order #{order_id}.\n\n"
+                f"Error: {str(e)}\n\n"
+                f"Please check if you have write permissions to the selected location."
+            )
+
+    def copy_text(self, receipt_html, order_id):
+        """Copy the receipt as plain text to the clipboard."""
+        try:
+            doc = QTextDocument()
+            doc.setHtml(receipt_html)
+            QApplication.clipboard().setText(doc.toPlainText())
+
+            QMessageBox.information(
+                self.parent,
+                "Text Copied",
+                f"Receipt text for Order #{order_id} has been copied to clipboard.\n\n"
+                f"You can now paste it into any text editor or document."
+            )
+
+        except Exception as e:
+            log.error(f"Copy to clipboard failed for order {order_id}: {str(e)}")
+            QMessageBox.warning(
+                self.parent,
+                "Copy Failed",
+                f"Failed to copy receipt text to clipboard.\n\nError: {str(e)}"
+            )
@@ -4,9 +4,12 @@ End-to-end test script for the Order Management System.
 This script will test all major functionalities of the application.
 """
 
+import inspect
 import sys
 import os
 from db import Database
+from db_profiling import capture_statements
+from log_config import configure_logging
 
 def test_database_operations():
     """Test basic database operations."""
@@ -183,6 +186,122 @@ def test_analytics(db):
     except Exception as e:
         print(f"❌ Error in analytics: {e}")
 
+def _is_full_scan(detail, derived=(), allowed=()):
+    """True for a plan step that reads a whole table without any index.
+
+    derived names subquery results (MATERIALIZE / CO-ROUTINE steps); scanning
+    those reads no table. allowed names tables whose full scan is intended.
+    """
+    if not detail.startswith("SCAN") or "INDEX" in detail or "PRIMARY KEY" in detail:
+        return False
+    name = detail[len("SCAN "):].split(" ")[0]
+    return not (name.startswith("(subquery") or name in derived or name in allowed)
+
+def test_query_plans(db, order_id):
+    """Check with EXPLAIN QUERY PLAN that every read path is served by an index."""
+    print("\n🔎 TESTING QUERY PLANS")
+    print("-" * 40)
+
+    date_from, date_to = "2000-01-01 00:00:00", "2999-12-31 23:59:59"
+    # (method, args, filtered, allowed): filtered calls must not start from a
+    # full scan. Listing and streaming methods may scan their driving table,
+    # but never a joined one. allowed names tables whose full scan is intended.
+    calls = [
+        ("get_items", (), False, ()),
+        ("get_today_menu", (), False, ()),
+        ("get_employees", (), False, ()),
+        ("get_orders", (), False, ()),
+        ("get_orders_with_items", (), False, ()),
+        ("get_order_items", (order_id or 0,), True, ()),
+        ("get_order_receipt", (order_id or 0,), True, ()),
+        ("get_kpis", (date_from, date_to), True, ()),
+        ("get_top_items", (10, date_from, date_to), True, ()),
+        ("get_hourly_revenue", (date_from, date_to), True, ()),
+        ("get_employee_spend", (10, date_from, date_to), True, ()),
+        ("get_top_debtors", (10,), True, ()),
+        ("get_recent_orders", (10, date_from, date_to), True, ()),
+        ("get_items_page", (100, 1), True, ()),
+        ("get_employees_page", (100, 1, "amount_due", 0.0, True), True, ()),
+        ("get_orders_page", (100, order_id or 0, "order_id", None, True), True, ()),
+        # FTS5 reads its small config table once per connection
+        ("search_employees", ("raj",), True, ("main.employees_fts_config",)),
+        ("search_employees", ("raj", 20, "amount_due"), True, ("main.employees_fts_config",)),
+        # under three characters there is no trigram to look up: substring match over every employee
+        ("search_employees", ("ra",), True, ("e",)),
+        ("search_employees", ("ra", 20, "amount_due"), True, ()),
+        ("iter_items", (), False, ()),
+        ("iter_employees", (), False, ()),
+        ("iter_orders", (), False, ()),
+        ("iter_order_receipts", (date_from, date_to), True, ()),
+        ("iter_order_receipts", (), False, ()),
+        ("iter_employee_statements", (date_from, date_to), False, ()),
+    ]
+
+    failures = 0
+    for method, args, filtered, allowed in calls:
+        # keeps the profiler's trace callback in place when OMS_DB_PROFILE is set
+        with capture_statements(db.conn) as statements:
+            result = getattr(db, method)(*args)
+            if inspect.isgenerator(result):
+                list(result)  # streaming readers only query as they are consumed
+
+        bad_steps = []
+        for sql in statements:
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = db.explain_query_plan(sql)
+            derived = {step.split(" ", 1)[1] for step in plan if step.startswith(("MATERIALIZE ", "CO-ROUTINE "))}
+            checked = plan if filtered else plan[1:]
+            bad_steps.extend(step for step in checked if _is_full_scan(step, derived, allowed))
+
+        if bad_steps:
+            failures += 1
+            print(f"❌ {method}{args!r}: {'; '.join(bad_steps)}")
+        else:
+            print(f"✓ {method}{args!r} uses indexes")
+
+    if failures:
+        print(f"❌ {failures} method(s) fall back to full table scans")
+    else:
+        print("✅ All read paths use indexes")
+    return failures == 0
+
+def test_thermal_receipt(db, order_id):
+    """Render an ESC/POS receipt and write it to a file standing in for the printer."""
+    import tempfile
+    import time
+    from escpos import WIDTH, render_receipt_escpos, write_receipt_escpos
+
+    print("\n🧾 TESTING THERMAL RECEIPT")
+    print("-" * 40)
+
+    receipt = db.get_order_receipt(order_id) if order_id else None
+    if receipt is None:
+        print("❌ Cannot test thermal receipt - no order")
+        return
+
+    data = render_receipt_escpos(receipt)
+    text_lines = [line for line in data.split(b"\n") if b"\x1b" not in line and b"\x1d" not in line]
+    too_wide = [line for line in text_lines if len(line) > WIDTH]
+    if too_wide or b"Rs. " not in data:
+        print(f"❌ Bad layout: {len(too_wide)} line(s) wider than {WIDTH} columns")
+    else:
+        print(f"✓ {len(text_lines)} text lines, none wider than {WIDTH} columns")
+
+    runs = 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        render_receipt_escpos(receipt)
+    per_receipt_ms = (time.perf_counter() - start) * 1000 / runs
+    print(f"{'✓' if per_receipt_ms < 1 else '❌'} Rendered in {per_receipt_ms:.3f} ms per receipt")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        device = os.path.join(tmp, "printer.bin")
+        written = write_receipt_escpos(receipt, device)
+        with open(device, "rb") as f:
+            ok = f.read() == data
+    print(f"{'✓' if ok else '❌'} Wrote {written} bytes to the stand-in device")
+
 def test_order_deletion(db, order_id):
     """Test order deletion functionality."""
     print("\n🗑️ TESTING ORDER DELETION")
@@ -212,8 +331,30 @@ def test_order_deletion(db, order_id):
     except Exception as e:
         print(f"❌ Error in order deletion: {e}")
 
+def test_failed_write_recovery(db, employees, today_menu):
+    """A rejected duplicate employee must not block the next order."""
+    print("\n♻️ TESTING RECOVERY AFTER A FAILED WRITE")
+    print("-" * 40)
+
+    if not employees or not today_menu:
+        print("❌ Cannot test recovery - missing data")
+        return
+
+    emp_id, emp_name = employees[0][1], employees[0][2]
+    added = db.add_employee(emp_id, emp_name)
+    print(f"{'✓' if added is False else '❌'} Duplicate employee {emp_id} rejected")
+    print(f"{'✓' if not db.conn.in_transaction else '❌'} No transaction left open")
+
+    try:
+        order_id = db.place_order(emp_id, [(today_menu[0][0], 1)])
+        print(f"✅ Order #{order_id} placed after the duplicate")
+        db.delete_order(order_id)
+    except Exception as e:
+        print(f"❌ Order after a duplicate employee failed: {e}")
+
 def main():
     """Main test function."""
+    configure_logging()
     print("=" * 60)
     print("ORDER MANAGEMENT SYSTEM - END-TO-END TEST")
     print("=" * 60)
@@ -233,8 +374,17 @@ def main():
     # Test 5: Analytics
     test_analytics(db)
     
-    # Test 6: Order Deletion
+    # Test 6: Query Plans
+    test_query_plans(db, order_id)
+    
+    # Test 7: Thermal Receipt
+    test_thermal_receipt(db, order_id)
+
+    # Test 8: Order Deletion
     test_order_deletion(db, order_id)
+
+    # Test 9: Recovery After a Failed Write
+    test_failed_write_recovery(db, employees, today_menu)
     
     print("\n" + "=" * 60)
     print("✅ END-TO-END TEST COMPLETED!")
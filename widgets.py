@@ -0,0 +1,194 @@
+"""
+Reusable widgets and helpers shared by several tabs.
+"""
+
+from PyQt5.QtCore import QEvent, QModelIndex, QObject, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QProgressDialog, QStyledItemDelegate
+
+from batch_export import ExportWorker
+from importers import ImportWorker
+
+
+class EmployeeAutocomplete(QObject):
+    """Debounced employee suggestions for a search QLineEdit and a QListWidget.
+
+    search(text, limit) must return (id, emp_id, emp_name, amount_due) rows
+    matching text as a substring of the ID or name, e.g. Database.search_employees.
+    format_item(row) returns the (label, data) shown for a row; data is stored
+    under Qt.UserRole.
+
+    Typing only triggers a search once input pauses for delay_ms. While the
+    query keeps growing, results are narrowed from the previous candidate pool
+    instead of searching again, as long as that pool was complete. At most
+    limit rows are shown, and list items are updated in place.
+    """
+
+    POOL_FACTOR = 4  # candidates fetched per visible row, so refinements stay local
+
+    def __init__(self, line_edit, list_widget, search, format_item, limit=50, delay_ms=150, parent=None):
+        super().__init__(parent or line_edit)
+        self.line_edit = line_edit
+        self.list_widget = list_widget
+        self.search = search
+        self.format_item = format_item
+        self.limit = limit
+
+        self._query = ""
+        self._pool = []
+        self._pool_complete = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+
+        line_edit.textChanged.connect(self._timer.start)
+        line_edit.returnPressed.connect(self.flush)
+
+    def flush(self):
+        """Update suggestions for the current text right away."""
+        self._timer.stop()
+        self._update(self.line_edit.text())
+
+    def refresh(self):
+        """Search again for the current text, e.g. after the data changed."""
+        self._query = ""
+        self._pool = []
+        self._pool_complete = False
+        self.flush()
+
+    def clear(self):
+        """Forget the previous results and empty the list."""
+        self._timer.stop()
+        self._query = ""
+        self._pool = []
+        self._pool_complete = False
+        self.list_widget.clear()
+
+    def _update(self, text):
+        query = text.strip().lower()
+        if not query:
+            self.clear()
+            return
+
+        if self._pool_complete and self._query and query.startswith(self._query):
+            # Growing query: every match must already be in the complete pool.
+            self._pool = [row for row in self._pool if self._matches(row, query)]
+        else:
+            pool_size = self.limit * self.POOL_FACTOR
+            self._pool = list(self.search(query, pool_size))
+            self._pool_complete = len(self._pool) < pool_size
+        self._query = query
+        self._show(self._pool[:self.limit])
+
+    @staticmethod
+    def _matches(row, query):
+        _, emp_id, name, _ = row
+        return query in emp_id.lower() or query in name.lower()
+
+    def _show(self, rows):
+        """Reuse existing list items; only add or remove the difference."""
+        self.list_widget.setUpdatesEnabled(False)
+        try:
+            for index, row in enumerate(rows):
+                label, data = self.format_item(row)
+                item = self.list_widget.item(index)
+                if item is None:
+                    self.list_widget.addItem(label)
+                    item = self.list_widget.item(index)
+                elif item.text() != label:
+                    item.setText(label)
+                item.setData(Qt.UserRole, data)
+            while self.list_widget.count() > len(rows):
+                self.list_widget.takeItem(self.list_widget.count() - 1)
+        finally:
+            self.list_widget.setUpdatesEnabled(True)
+
+
+class ActionDelegate(QStyledItemDelegate):
+    """Draws a cell as a flat button and emits clicked(index) when it is pressed.
+
+    Used instead of a QPushButton per row, so views with many rows do not
+    create a widget for each of them. The label is the cell's DisplayRole.
+    """
+
+    clicked = pyqtSignal(QModelIndex)
+
+    def __init__(self, color="#dc3545", parent=None):
+        super().__init__(parent)
+        self.color = QColor(color)
+
+    def paint(self, painter, option, index):
+        rect = option.rect.adjusted(4, 3, -4, -3)
+        painter.save()
+        painter.setRenderHint(painter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.color)
+        painter.drawRoundedRect(rect, 3, 3)
+        painter.setPen(Qt.white)
+        painter.drawText(rect, Qt.AlignCenter, str(index.data(Qt.DisplayRole) or ""))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if option.rect.contains(event.pos()):
+                self.clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
+
+
+def start_import(parent, db, kind, file_path, on_completed, on_failed):
+    """Run an ImportWorker for file_path behind a cancellable progress dialog.
+
+    on_completed(result) or on_failed(message) is called on the GUI thread
+    when the import ends. Returns the worker, already started.
+    """
+    worker = ImportWorker(db, kind, file_path, parent)
+    return _start_with_progress(parent, worker, f"Importing {kind}...", on_completed, on_failed)
+
+
+def start_export(parent, db, kind, out_dir, date_from, date_to, merged, on_completed, on_failed):
+    """Run an ExportWorker writing kind PDFs to out_dir behind a cancellable progress dialog.
+
+    on_completed(result) or on_failed(message) is called on the GUI thread
+    when the export ends. Returns the worker, already started.
+    """
+    worker = ExportWorker(db, kind, out_dir, date_from, date_to, merged, parent)
+    if merged:  # rendered in one pass: no partial progress and no way to stop it
+        label = f"Exporting {kind} to a single merged PDF...\nThis cannot be cancelled once started."
+        return _start_with_progress(parent, worker, label, on_completed, on_failed, cancellable=False)
+    return _start_with_progress(parent, worker, f"Exporting {kind}...", on_completed, on_failed)
+
+
+def _start_with_progress(parent, worker, label, on_completed, on_failed, cancellable=True):
+    """Start a worker with progress/completed/failed signals under a progress dialog.
+
+    Without cancellable the dialog shows a busy bar and no Cancel button.
+    """
+    dialog = QProgressDialog(label, "Cancel", 0, 100, parent)
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(300)  # quick jobs never flash a dialog
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+    dialog.setValue(0)
+
+    if cancellable:
+        worker.progress.connect(dialog.setValue)
+        dialog.canceled.connect(worker.requestInterruption)
+    else:
+        dialog.setCancelButton(None)
+        dialog.setRange(0, 0)
+
+    def done(callback, value):
+        if cancellable:
+            dialog.canceled.disconnect(worker.requestInterruption)
+        dialog.close()
+        dialog.deleteLater()
+        callback(value)
+
+    worker.completed.connect(lambda result: done(on_completed, result))
+    worker.failed.connect(lambda message: done(on_failed, message))
+    worker.finished.connect(worker.deleteLater)
+    worker.start()
+    return worker